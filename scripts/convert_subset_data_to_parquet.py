@@ -0,0 +1,14 @@
+import pandas as pd
+
+from src.data_pipeline.parquet_storage import write_stage
+
+if __name__ == "__main__":
+    # Convert the existing CSV stages into the partitioned Parquet store
+    stage_files = {
+        "cleaned": "win23_subset_zip_grow_tower_side_b_cleaned.csv",
+        "interpolated": "win23_subset_zip_grow_tower_side_b_cleaned_interpolated.csv",
+        "simulated": "win23_subset_zip_grow_tower_side_b_simulated.csv",
+    }
+    for stage, file_name in stage_files.items():
+        df = pd.read_csv("data/daily_system_data/" + file_name)
+        write_stage(df, stage, "subset_zip_grow_tower_side_b", "win23")
@@ -0,0 +1,26 @@
+import numpy as np
+
+from src.system_identification.fleet_identification import identify_fleet
+
+if __name__ == "__main__":
+    # Identify every tower in the Parquet store over a grid of model choices
+    results = identify_fleet(num_block_rows_grid=(1, 2, 3), rank_grid=(2, 3, 4, 5, 6))
+
+    # Save the fit metrics of every grid point
+    results.drop(columns=["A", "B", "C", "D", "covariance"]).to_csv(
+        "data/state_space_model_weights/fleet_identification.csv", index=False
+    )
+
+    # Save A, B, C, D matrices and noise covariance of the best fitting model of each tower
+    fit_columns = [col for col in results.columns if col.startswith("fit_")]
+    results["mean_fit"] = results[fit_columns].mean(axis=1)
+    best = results.dropna(subset=["mean_fit"]).sort_values("mean_fit", ascending=False)
+    for _, row in best.drop_duplicates(subset=["tower", "season"]).iterrows():
+        np.savez(
+            f"data/state_space_model_weights/{row['season']}_{row['tower']}_simulated.npz",
+            A=row["A"],
+            B=row["B"],
+            C=row["C"],
+            D=row["D"],
+            covariance=row["covariance"],
+        )
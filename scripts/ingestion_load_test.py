@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from src.data_pipeline.parquet_storage import read_stage
+from src.ingestion.device_simulator import load_trajectory, replay_devices
+from src.ingestion.ingestion_service import IngestionService, kalman_filter_factory
+from src.system_identification.fleet_identification import identify_system
+
+
+async def main(num_devices=200, repeats=10):
+    # Every fake device uses the model identified for the subset tower, with the
+    # noise covariance that the Kalman filters need
+    weights = identify_system(
+        read_stage("interpolated", tower="subset_zip_grow_tower_side_b", season="win23")
+    )
+    service = IngestionService(
+        kalman_filter_factory(
+            weights["A"],
+            weights["B"],
+            weights["C"],
+            weights["D"],
+            weights["covariance"],
+        ),
+        window=0.05,
+    )
+    port = await service.start()
+
+    # Replay the simulated trajectory from many devices at once, as fast as the
+    # service accepts the readings
+    start = time.perf_counter()
+    num_sent = await replay_devices(
+        "127.0.0.1", port, num_devices, trajectory=load_trajectory(), repeats=repeats
+    )
+    await service.stop()
+    elapsed = time.perf_counter() - start
+
+    print(f"Devices: {num_devices}")
+    print(f"Readings sent: {num_sent}, processed: {service.num_readings}")
+    print(f"Batches: {service.num_batches}, rejected lines: {service.num_rejected}")
+    print(f"Failed readings: {service.num_failed}")
+    print(f"Throughput: {service.num_readings / elapsed:,.0f} readings/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
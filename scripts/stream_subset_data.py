@@ -0,0 +1,11 @@
+from src.data_pipeline.streaming import run_streaming_pipeline
+
+if __name__ == "__main__":
+    # Clean, interpolate and simulate the raw logs chunk by chunk
+    run_streaming_pipeline(
+        "data/daily_system_data/win23_subset_zip_grow_tower_side_b_manual_mod.csv",
+        "data/daily_system_data/win23_subset_zip_grow_tower_side_b_simulated.csv",
+        "data/state_space_model_weights/win23_subset_zip_grow_tower_side_b_simulated.npz",
+        year=2023,
+        chunksize=10_000,
+    )
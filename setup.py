@@ -9,4 +9,5 @@ setup(
     name="indoor_farm",
     install_requires=INSTALL_REQUIRES,
     packages=find_packages(),
+    entry_points={"console_scripts": ["indoor-farm=src.cli:main"]},
 )
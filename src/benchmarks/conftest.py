@@ -0,0 +1,52 @@
+import functools
+import io
+
+import pandas as pd
+import pytest
+
+from src.data_pipeline.cleaning import clean_daily_system_data
+from src.data_pipeline.interpolation import interpolate_daily_system_data
+from src.data_pipeline.synthetic_data import generate_daily_system_log
+from src.system_identification.fleet_identification import identify_system
+
+# Lengths of the synthetic logs, in years of daily records
+LOG_YEARS = [1, 5, 20]
+
+
+@functools.lru_cache(maxsize=None)
+def _raw_log(years):
+    # Synthetic log read back from CSV, so the column types match the recorded logs
+    buffer = io.StringIO()
+    generate_daily_system_log(365 * years, seed=years).to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+
+@functools.lru_cache(maxsize=None)
+def _cleaned_log(years):
+    return clean_daily_system_data(_raw_log(years).copy())
+
+
+@functools.lru_cache(maxsize=None)
+def _interpolated_log(years):
+    return interpolate_daily_system_data(_cleaned_log(years))
+
+
+@pytest.fixture(scope="session", params=LOG_YEARS, ids=lambda years: f"{years}y")
+def raw_log(request):
+    return _raw_log(request.param)
+
+
+@pytest.fixture(scope="session", params=LOG_YEARS, ids=lambda years: f"{years}y")
+def cleaned_log(request):
+    return _cleaned_log(request.param)
+
+
+@pytest.fixture(scope="session", params=LOG_YEARS, ids=lambda years: f"{years}y")
+def interpolated_log(request):
+    return _interpolated_log(request.param)
+
+
+@pytest.fixture(scope="session")
+def identified_model():
+    return identify_system(_interpolated_log(1))
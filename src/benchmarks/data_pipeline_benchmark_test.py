@@ -0,0 +1,13 @@
+from src.data_pipeline.cleaning import clean_daily_system_data
+from src.data_pipeline.interpolation import interpolate_daily_system_data
+
+
+# Throughput is the number of rows in the extra info over the measured time
+def test_clean(benchmark, raw_log):
+    benchmark(lambda: clean_daily_system_data(raw_log.copy()))
+    benchmark.extra_info["rows"] = len(raw_log)
+
+
+def test_interpolate(benchmark, cleaned_log):
+    benchmark(interpolate_daily_system_data, cleaned_log)
+    benchmark.extra_info["rows"] = len(cleaned_log)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+from src.linear_control_system.linear_control_system import LinearControlSystem
+from src.linear_control_system.simulation import simulate_dataframe
+from src.system_identification.fleet_identification import identify_system
+
+
+@pytest.mark.parametrize("num_block_rows", [1, 4])
+def test_identify_system(benchmark, interpolated_log, num_block_rows):
+    # Identification takes long enough that a few rounds are representative
+    benchmark.pedantic(
+        identify_system,
+        args=(interpolated_log,),
+        kwargs={"num_block_rows": num_block_rows},
+        rounds=3,
+        iterations=1,
+    )
+    benchmark.extra_info["rows"] = len(interpolated_log)
+
+
+def test_simulate_dataframe(benchmark, interpolated_log, identified_model):
+    A, B, C, D = (identified_model[name] for name in ("A", "B", "C", "D"))
+    system = LinearControlSystem(A, B, np.zeros(A.shape[0]), C, D)
+    benchmark(
+        simulate_dataframe, system, interpolated_log, INPUT_COLUMNS, OUTPUT_COLUMNS
+    )
+    benchmark.extra_info["rows"] = len(interpolated_log)
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from src.linear_control_system.linear_control_system import LinearControlSystem
+
+STATE_DIMENSIONS = [3, 10, 30, 100]
+
+
+def uncached(name):
+    # Analysis methods are memoized, so their cost is measured without the cache
+    return getattr(LinearControlSystem, name).__wrapped__
+
+
+def make_system(n=3, m=5, p=3, seed=0):
+    rng = np.random.default_rng(seed)
+    A = rng.standard_normal((n, n))
+    A *= 0.9 / np.max(np.abs(np.linalg.eigvals(A)))
+    return LinearControlSystem(
+        A,
+        rng.standard_normal((n, m)),
+        rng.standard_normal(n),
+        rng.standard_normal((p, n)),
+        rng.standard_normal((p, m)),
+    )
+
+
+# Benchmarks for stepping the system
+def test_calculate_next_state(benchmark):
+    system = make_system()
+    u = np.ones(5)
+    benchmark(system.calculate_next_state, u)
+
+
+@pytest.mark.parametrize("num_steps", [365, 3650])
+def test_calculate_next_state_loop(benchmark, num_steps):
+    system = make_system()
+    U = np.random.default_rng(1).standard_normal((num_steps, 5))
+
+    def step_all():
+        for u in U:
+            system.calculate_next_state(u)
+
+    benchmark(step_all)
+    benchmark.extra_info["steps"] = num_steps
+
+
+def test_step(benchmark):
+    system = make_system().enable_hot_path()
+    u = np.ones(5)
+    benchmark(system.step, u)
+
+
+@pytest.mark.parametrize("num_steps", [365, 3650])
+def test_step_loop(benchmark, num_steps):
+    system = make_system().enable_hot_path()
+    U = np.random.default_rng(1).standard_normal((num_steps, 5))
+
+    def step_all():
+        for u in U:
+            system.step(u)
+
+    benchmark(step_all)
+    benchmark.extra_info["steps"] = num_steps
+
+
+@pytest.mark.parametrize("num_steps", [365, 3650])
+def test_rollout(benchmark, num_steps):
+    system = make_system()
+    U = np.random.default_rng(1).standard_normal((128, 5))
+    system.precompute_rollout(128)
+
+    def rollout_all():
+        for _ in range(num_steps // 128 + 1):
+            system.x = system.rollout(U)[-1]
+
+    benchmark(rollout_all)
+    benchmark.extra_info["steps"] = num_steps
+
+
+# Benchmarks for controllability and observability as the state dimension grows
+@pytest.mark.parametrize("n", STATE_DIMENSIONS)
+@pytest.mark.parametrize("rank_only", [False, True])
+def test_controllability(benchmark, n, rank_only):
+    system = make_system(n=n)
+    benchmark(uncached("compute_controllability_matrix"), system, rank_only=rank_only)
+
+
+@pytest.mark.parametrize("n", STATE_DIMENSIONS)
+@pytest.mark.parametrize("rank_only", [False, True])
+def test_observability(benchmark, n, rank_only):
+    system = make_system(n=n)
+    benchmark(uncached("compute_observability_matrix"), system, rank_only=rank_only)
+
+
+@pytest.mark.parametrize("n", STATE_DIMENSIONS)
+def test_eigen(benchmark, n):
+    system = make_system(n=n)
+    benchmark(uncached("compute_A_eigen"), system)
+
+
+# Benchmarks for the Gramians and balanced truncation
+@pytest.mark.parametrize("n", STATE_DIMENSIONS)
+def test_controllability_gramian(benchmark, n):
+    system = make_system(n=n)
+    benchmark(uncached("compute_controllability_gramian"), system)
+
+
+@pytest.mark.parametrize("n", STATE_DIMENSIONS)
+def test_balanced_truncation(benchmark, n):
+    system = make_system(n=n)
+    benchmark(system.balanced_truncation, order=min(n, 3))
+
+
+# Benchmark for polling stability of a system whose matrices do not change
+def test_memoized_stability(benchmark):
+    system = make_system(n=30)
+
+    def poll():
+        system.is_stable()
+        system.compute_controllability_matrix(rank_only=True)
+        system.compute_observability_matrix(rank_only=True)
+
+    benchmark(poll)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from src.linear_control_system.linear_control_system import LinearControlSystem
+from src.scenario_analysis.scenario_sweep import ScenarioSweep, policy_grid
+
+# 648 dosing policies
+AMOUNTS = {
+    "pH_down_mL": [0, 1, 2, 4],
+    "pH_up_mL": [0, 1, 2],
+    "nutrient_mature_gallons": [0, 0.5, 1],
+    "water_gallons": [0, 0.5, 1],
+}
+EVERY = {"pH_down_mL": [1, 3, 7], "water_gallons": [1, 7]}
+
+
+@pytest.mark.parametrize("num_towers", [1, 10, 100])
+def test_time_in_band(benchmark, identified_model, num_towers):
+    A, B, C, D = (identified_model[name] for name in ("A", "B", "C", "D"))
+    system = LinearControlSystem(A, B, np.zeros(A.shape[0]), C, D)
+    sweep = ScenarioSweep.from_systems(
+        [system] * num_towers,
+        initial_outputs=[2200, 6.2, 5.5],
+    )
+    amounts, every = policy_grid(AMOUNTS, EVERY)
+    benchmark.pedantic(
+        sweep.time_in_band, args=(amounts, every, 365), rounds=3, iterations=1
+    )
+    benchmark.extra_info["policies"] = len(amounts)
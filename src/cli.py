@@ -0,0 +1,258 @@
+import argparse
+import os
+
+# Only argparse and os are imported at startup. Every command imports the pandas,
+# pyarrow, matplotlib or nfoursid code it needs when it runs, so the scheduled
+# per-tower jobs and --help do not pay for the dependencies of the other commands.
+
+DATA_ROOT = "data/daily_system_data"
+DEFAULT_TOWER = "subset_zip_grow_tower_side_b"
+DEFAULT_SEASON = "win23"
+
+# Columns of each stage that are plotted, with the desired ranges of the outputs
+PLOT_COLUMNS = {
+    "interpolated": [
+        "initial_ec",
+        "initial_ph",
+        "initial_nutrient_solution_volume",
+        "pH_down_mL",
+        "pH_up_mL",
+        "nutrient_mature_gallons",
+        "nutrient_immature_gallons",
+        "water_gallons",
+    ],
+    "simulated": [
+        "sim_initial_ec",
+        "sim_initial_ph",
+        "sim_initial_nutrient_solution_volume",
+        "pH_down_mL",
+        "pH_up_mL",
+        "nutrient_mature_gallons",
+        "nutrient_immature_gallons",
+        "water_gallons",
+    ],
+}
+
+
+def season_year(season):
+    # e.g. win23 -> 2023
+    try:
+        return 2000 + int(season[3:])
+    except ValueError:
+        raise ValueError(f"Season {season} must end with a two digit year") from None
+
+
+def csv_path(args, suffix):
+    # e.g. data/daily_system_data/win23_subset_zip_grow_tower_side_b_cleaned.csv
+    return os.path.join(args.data_dir, f"{args.season}_{args.tower}_{suffix}.csv")
+
+
+def weights_path(args):
+    from src.model_registry.model_registry import MODEL_WEIGHTS_ROOT, model_name
+
+    weights_dir = args.weights_dir or MODEL_WEIGHTS_ROOT
+    return os.path.join(weights_dir, model_name(args.tower, args.season) + ".npz")
+
+
+def clean(args):
+    import pandas as pd
+
+    from src.data_pipeline.cleaning import clean_daily_system_data
+    from src.data_pipeline.parquet_storage import write_stage
+    from src.instrumentation.instrumentation import span
+
+    # Parse adjustments of the manually recorded log into actuator columns and drop
+    # unmeasured values
+    with span("read_csv") as read:
+        df = pd.read_csv(args.input or csv_path(args, "manual_mod"))
+        read.rows = len(df)
+    year = args.year or season_year(args.season)
+    result_df = clean_daily_system_data(df, year=year)
+
+    if args.csv:
+        with span("to_csv", rows=len(result_df)):
+            result_df.to_csv(csv_path(args, "cleaned"), index=False, mode="w")
+    write_stage(result_df, "cleaned", args.tower, args.season, root=args.parquet_root)
+
+
+def interpolate(args):
+    from src.data_pipeline.interpolation import interpolate_daily_system_data
+    from src.data_pipeline.parquet_storage import read_stage, write_stage
+    from src.instrumentation.instrumentation import span
+
+    # Interpolate missing EC, pH and volume measurements of the cleaned stage
+    root = args.parquet_root
+    df = read_stage("cleaned", tower=args.tower, season=args.season, root=root).drop(
+        columns=["tower", "season"]
+    )
+    df = interpolate_daily_system_data(df)
+
+    if args.csv:
+        with span("to_csv", rows=len(df)):
+            df.to_csv(csv_path(args, "cleaned_interpolated"), index=False)
+    write_stage(df, "interpolated", args.tower, args.season, root=root)
+
+
+def identify(args):
+    import numpy as np
+
+    from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+    from src.data_pipeline.parquet_storage import read_stage
+    from src.system_identification.fleet_identification import identify_system
+
+    # Identify the state space model of the interpolated stage with N4SID and save
+    # the A, B, C, D matrices and the noise covariance
+    df = read_stage(
+        "interpolated",
+        columns=["date"] + OUTPUT_COLUMNS + INPUT_COLUMNS,
+        tower=args.tower,
+        season=args.season,
+        root=args.parquet_root,
+    )
+    result = identify_system(df, num_block_rows=args.num_block_rows, rank=args.rank)
+    np.savez(
+        weights_path(args),
+        **{name: result[name] for name in ("A", "B", "C", "D", "covariance")},
+    )
+    for col in OUTPUT_COLUMNS:
+        print(
+            f"{col}: fit {result['fit_' + col]:.1f}%, rmse {result['rmse_' + col]:.4g}"
+        )
+
+
+def simulate(args):
+    import numpy as np
+
+    from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+    from src.data_pipeline.parquet_storage import read_stage, write_stage
+    from src.instrumentation.instrumentation import span
+    from src.linear_control_system.linear_control_system import LinearControlSystem
+    from src.linear_control_system.simulation import simulate_dataframe
+
+    # Simulate the saved model over the interpolated stage, from the least squares
+    # initial state of the first measurement
+    root = args.parquet_root
+    with np.load(weights_path(args)) as weights:
+        A, B, C, D = (weights[name] for name in ("A", "B", "C", "D"))
+    system = LinearControlSystem(A, B, np.zeros(A.shape[0]), C, D)
+    df = read_stage(
+        "interpolated",
+        columns=["date"] + OUTPUT_COLUMNS + INPUT_COLUMNS,
+        tower=args.tower,
+        season=args.season,
+        root=root,
+    )
+    simulated_df = simulate_dataframe(system, df, INPUT_COLUMNS, OUTPUT_COLUMNS)
+
+    if args.csv:
+        with span("to_csv", rows=len(simulated_df)):
+            simulated_df.to_csv(csv_path(args, "simulated"), index=False)
+    write_stage(simulated_df, "simulated", args.tower, args.season, root=root)
+
+
+def plot(args):
+    from src.plotting.plotting import PLOTS_ROOT, render_fleet
+
+    # One figure per tower and season, of every tower in the stage with --all-towers
+    towers = None if args.all_towers else [(args.tower, args.season)]
+    simulated = args.stage == "simulated"
+    render_fleet(
+        args.stage,
+        columns=PLOT_COLUMNS[args.stage],
+        suffix="simulated" if simulated else "cleaned_interpolated",
+        towers=towers,
+        output_dir=args.plots_dir or PLOTS_ROOT,
+        # The first simulated row is the initial state estimate
+        first_row=1 if simulated else 0,
+        title_suffix=" Simulated" if simulated else "",
+        root=args.parquet_root,
+        max_workers=args.workers,
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="indoor-farm",
+        description="Clean, interpolate, identify, simulate and plot tower logs.",
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--tower", default=DEFAULT_TOWER, help="tower name")
+    common.add_argument(
+        "--season", default=DEFAULT_SEASON, help="season and year, e.g. win23"
+    )
+    common.add_argument(
+        "--data-dir", default=DATA_ROOT, help="directory of the CSV stages"
+    )
+    common.add_argument(
+        "--parquet-root",
+        help="root of the Parquet stages (default: <data-dir>/parquet)",
+    )
+    common.add_argument(
+        "--weights-dir",
+        help="directory of the model weights (default: data/state_space_model_weights)",
+    )
+    # Options of the commands that write a stage
+    stage_output = argparse.ArgumentParser(add_help=False)
+    stage_output.add_argument(
+        "--no-csv",
+        dest="csv",
+        action="store_false",
+        help="only write the Parquet stage, without the CSV copy",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    clean_parser = subparsers.add_parser(
+        "clean", parents=[common, stage_output], help="clean a manually recorded log"
+    )
+    clean_parser.add_argument(
+        "--input",
+        help="raw log CSV (default: <data-dir>/<season>_<tower>_manual_mod.csv)",
+    )
+    clean_parser.add_argument(
+        "--year", type=int, help="year of the log dates (default: from the season)"
+    )
+    clean_parser.set_defaults(handler=clean)
+
+    interpolate_parser = subparsers.add_parser(
+        "interpolate",
+        parents=[common, stage_output],
+        help="interpolate the cleaned stage",
+    )
+    interpolate_parser.set_defaults(handler=interpolate)
+
+    identify_parser = subparsers.add_parser(
+        "identify", parents=[common], help="identify a state space model with N4SID"
+    )
+    identify_parser.add_argument("--num-block-rows", type=int, default=1)
+    identify_parser.add_argument("--rank", type=int, default=3)
+    identify_parser.set_defaults(handler=identify)
+
+    simulate_parser = subparsers.add_parser(
+        "simulate", parents=[common, stage_output], help="simulate the identified model"
+    )
+    simulate_parser.set_defaults(handler=simulate)
+
+    plot_parser = subparsers.add_parser(
+        "plot", parents=[common], help="plot the interpolated or simulated stage"
+    )
+    plot_parser.add_argument("stage", choices=sorted(PLOT_COLUMNS))
+    plot_parser.add_argument(
+        "--all-towers", action="store_true", help="plot every tower of the stage"
+    )
+    plot_parser.add_argument(
+        "--plots-dir", help="output directory (default: data/daily_system_data_plots)"
+    )
+    plot_parser.add_argument("--workers", type=int, help="number of plot processes")
+    plot_parser.set_defaults(handler=plot)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.parquet_root is None:
+        args.parquet_root = os.path.join(args.data_dir, "parquet")
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
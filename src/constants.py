@@ -0,0 +1,22 @@
+# Column names and target ranges shared across the packages. This module has no
+# dependencies, so importing the column names does not import pandas or the
+# data pipeline.
+
+# Actuator columns produced from the free-text adjustment columns of the daily logs
+INPUT_COLUMNS = [
+    "pH_down_mL",
+    "pH_up_mL",
+    "nutrient_mature_gallons",
+    "nutrient_immature_gallons",
+    "water_gallons",
+]
+
+# Measured outputs of the identified state space models
+OUTPUT_COLUMNS = ["initial_ec", "initial_ph", "initial_nutrient_solution_volume"]
+
+# Desired ranges of the measured outputs, as drawn in the plot scripts
+TARGET_BANDS = {
+    "initial_ec": (2000, 2400),
+    "initial_ph": (6, 6.4),
+    "initial_nutrient_solution_volume": (5, 6),
+}
@@ -0,0 +1,109 @@
+import pandas as pd
+
+from src.instrumentation.instrumentation import instrumented, length_of
+
+MEASUREMENT_COLUMNS = [
+    "initial_ec",
+    "initial_ph",
+    "initial_nutrient_solution_volume",
+    "final_ec",
+    "final_ph",
+    "final_nutrient_solution_volume",
+]
+
+# Descriptor used in "Type of EC Adjustment" for each EC actuator column
+EC_ADJUSTMENT_DESCRIPTORS = {
+    "nutrient_mature_gallons": "mature",
+    "nutrient_immature_gallons": "immature",
+    "water_gallons": "water",
+}
+
+# Amounts such as "2mL", "4 mL", "1.5 gal" or "1/2 gal"
+AMOUNT_PATTERN = (
+    r"^\s*(?P<numerator>\d*\.?\d+)(?:\s*/\s*(?P<denominator>\d*\.?\d+))?"
+    r"\s*(?P<unit>[a-z]*)"
+)
+
+# One comma separated part of an EC adjustment type such as "1/2 immature"
+EC_ADJUSTMENT_PATTERN = (
+    r"(?:^|,)\s*(?:(?P<numerator>\d*\.?\d+)\s*/\s*(?P<denominator>\d*\.?\d+)\s+)?"
+    r"(?P<descriptor>{descriptor})\s*(?:,|$)"
+)
+
+DROPPED_COLUMNS = [
+    "comments",
+    "type_of_ph_adjustment",
+    "type_of_ec_adjustment",
+    "amount_of_ec_adjustment_used",
+    "amount_of_ph_adjustment_used",
+]
+
+
+def _fraction(parts):
+    numerator = pd.to_numeric(parts["numerator"])
+    denominator = pd.to_numeric(parts["denominator"]).fillna(1.0)
+    return (numerator / denominator).astype(float)
+
+
+def parse_amounts(amounts):
+    # Unparseable or missing amounts become NaN
+    parts = amounts.astype("string").str.lower().str.extract(AMOUNT_PATTERN)
+    return _fraction(parts)
+
+
+def parse_ph_adjustments(adjustment_types, amounts):
+    amount = parse_amounts(amounts).fillna(0.0)
+    return pd.DataFrame(
+        {
+            "pH_down_mL": amount.where(adjustment_types == "pH Down", 0.0),
+            "pH_up_mL": amount.where(adjustment_types == "pH Up", 0.0),
+        },
+        index=amount.index,
+    )
+
+
+def parse_ec_adjustments(adjustment_types, amounts):
+    adjustment_types = (
+        adjustment_types.astype("string")
+        .str.lower()
+        .str.replace(", no water", "", regex=False)
+    )
+    amount = parse_amounts(amounts).fillna(0.0)
+    adjustments = {}
+    for column, descriptor in EC_ADJUSTMENT_DESCRIPTORS.items():
+        parts = adjustment_types.str.extract(
+            EC_ADJUSTMENT_PATTERN.format(descriptor=descriptor)
+        )
+        fraction = _fraction(parts).fillna(1.0)
+        matched = parts["descriptor"].notna()
+        adjustments[column] = (amount * fraction).where(matched, 0.0)
+    return pd.DataFrame(adjustments, index=amount.index)
+
+
+@instrumented(rows=length_of(0, "df"))
+def clean_daily_system_data(df, year=2023):
+    # Replace all occurrences of "ADD WATER" with None
+    df = df.replace("ADD WATER", None)
+
+    # Rename columns to lowercase with underscores
+    df.columns = df.columns.str.lower().str.replace(" ", "_")
+
+    # Modify the date column format to add the year
+    df["date"] = df["date"] + f"/{year}"
+
+    # Parse the free-text adjustment columns into typed actuator columns
+    pH_adjustments = parse_ph_adjustments(
+        df["type_of_ph_adjustment"], df["amount_of_ph_adjustment_used"]
+    )
+    EC_adjustments = parse_ec_adjustments(
+        df["type_of_ec_adjustment"], df["amount_of_ec_adjustment_used"]
+    )
+    result_df = pd.concat(
+        [df.drop(columns=DROPPED_COLUMNS), pH_adjustments, EC_adjustments], axis=1
+    )
+
+    # Unmeasured and unknown values, or any other text, become missing measurements
+    for column in MEASUREMENT_COLUMNS:
+        result_df[column] = pd.to_numeric(result_df[column], errors="coerce")
+
+    return result_df
@@ -0,0 +1,197 @@
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation.instrumentation import instrumented, length_of
+
+# Measurements that are linearly interpolated between observed days
+INTERPOLATED_COLUMNS = [
+    "initial_ec",
+    "initial_ph",
+    "initial_nutrient_solution_volume",
+]
+
+
+# Longest run of missing days that is interpolated. Longer gaps are left missing,
+# which also bounds the rows a streaming interpolator holds back for an open gap.
+MAX_GAP = 30
+
+
+def _in_long_gap(missing, max_gap):
+    # Cells in runs of more than max_gap missing values, per column. Every run shares
+    # the number of observations before it.
+    runs = np.cumsum(~missing, axis=0)
+    long_gap = np.zeros_like(missing)
+    for i in range(missing.shape[1]):
+        lengths = np.bincount(runs[:, i], weights=missing[:, i])
+        long_gap[:, i] = missing[:, i] & (lengths[runs[:, i]] > max_gap)
+    return long_gap
+
+
+def _interpolate(values, max_gap):
+    interpolated = values.interpolate(method="linear")
+    if max_gap is None:
+        return interpolated
+    return interpolated.mask(_in_long_gap(values.isna().to_numpy(), max_gap))
+
+
+@instrumented(rows=length_of(0, "df"))
+def interpolate_daily_system_data(df, columns=INTERPOLATED_COLUMNS, max_gap=MAX_GAP):
+    df = df.copy()
+
+    # Convert 'date' column to datetime if it's not already
+    df["date"] = pd.to_datetime(df["date"])
+
+    # Interpolate missing values only for specific columns
+    for col in columns:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df[columns] = _interpolate(df[columns], max_gap)
+    return df
+
+
+class StreamingInterpolator:
+    def __init__(self, columns=INTERPOLATED_COLUMNS, max_gap=MAX_GAP):
+        self.columns = list(columns)
+        self.max_gap = max_gap
+        # Rows that may still change when later measurements arrive, as received.
+        # They start after the earliest last observation of a column whose trailing
+        # gap may still be filled, so with max_gap there are at most max_gap of them.
+        self.pending = None
+        # Last observation before the pending rows of every column with an open gap
+        # there, as (value, position relative to the first pending row)
+        self.anchors = {}
+
+    def _too_long(self, gap):
+        return self.max_gap is not None and gap > self.max_gap
+
+    def _interpolate(self, df):
+        # The anchors are prepended as rows, so the gaps they open are filled as in
+        # the batch case. Returns the values and interpolated values with the anchor
+        # rows, and the number of anchor rows.
+        num_anchor_rows = max(
+            (-offset for _, offset in self.anchors.values()), default=0
+        )
+        values = df[self.columns].apply(pd.to_numeric, errors="coerce")
+        if num_anchor_rows:
+            anchors = pd.DataFrame(
+                np.nan, index=range(num_anchor_rows), columns=self.columns
+            )
+            for col, (value, offset) in self.anchors.items():
+                anchors.loc[num_anchor_rows + offset, col] = value
+            values = pd.concat([anchors, values], ignore_index=True)
+        return values, _interpolate(values, self.max_gap), num_anchor_rows
+
+    def _with_values(self, df, interpolated):
+        df = df.copy()
+        df["date"] = pd.to_datetime(df["date"])
+        for col in self.columns:
+            df[col] = interpolated[col].to_numpy()
+        return df
+
+    @instrumented(rows=length_of(1, "df"))
+    def update(self, df):
+        if self.pending is not None:
+            df = pd.concat([self.pending, df], ignore_index=True)
+        else:
+            df = df.reset_index(drop=True)
+        values, interpolated, num_anchor_rows = self._interpolate(df)
+        num_rows = len(values)
+
+        # Rows up to the last observation of every column are settled. Leading gaps
+        # are never filled and a trailing gap that is already too long stays missing,
+        # so neither holds rows back.
+        positions = [
+            values[col].notna().to_numpy().nonzero()[0] for col in self.columns
+        ]
+        settled_rows = num_rows
+        for observed in positions:
+            if len(observed) and not self._too_long(num_rows - 1 - observed[-1]):
+                settled_rows = min(settled_rows, observed[-1] + 1)
+        settled_rows = max(settled_rows, num_anchor_rows)
+
+        # Anchors of the gaps that are open at the first pending row and may still be
+        # filled
+        self.anchors = {}
+        for col, observed in zip(self.columns, positions):
+            before = observed[observed < settled_rows]
+            after = observed[observed >= settled_rows]
+            if len(before) and not self._too_long(
+                (after[0] if len(after) else num_rows) - before[-1] - 1
+            ):
+                self.anchors[col] = (
+                    float(values[col].iloc[before[-1]]),
+                    int(before[-1] - settled_rows),
+                )
+
+        self.pending = df.iloc[settled_rows - num_anchor_rows :].reset_index(drop=True)
+        return self._with_values(
+            df.iloc[: settled_rows - num_anchor_rows],
+            interpolated.iloc[num_anchor_rows:settled_rows],
+        )
+
+    def provisional(self):
+        # Trailing gaps are filled with the last observed value, as in the batch case
+        if self.pending is None or self.pending.empty:
+            return None
+        _, interpolated, num_anchor_rows = self._interpolate(self.pending)
+        return self._with_values(self.pending, interpolated.iloc[num_anchor_rows:])
+
+    def flush(self):
+        df = self.provisional()
+        self.pending = None
+        self.anchors = {}
+        return df
+
+
+def _load_append_state(state_path):
+    if not os.path.exists(state_path):
+        return 0, None, {}
+    with open(state_path) as f:
+        state = json.load(f)
+    pending = pd.read_json(io.StringIO(json.dumps(state["pending"])), orient="table")
+    anchors = {col: tuple(anchor) for col, anchor in state["anchors"].items()}
+    return state["byte_offset"], pending, anchors
+
+
+def _save_append_state(state_path, byte_offset, interpolator):
+    state = {
+        "byte_offset": byte_offset,
+        "pending": json.loads(
+            interpolator.pending.to_json(orient="table", index=False)
+        ),
+        "anchors": interpolator.anchors,
+    }
+    with open(state_path, "w") as f:
+        json.dump(state, f)
+
+
+@instrumented(rows=length_of(0, "df"))
+def append_interpolated_data(
+    df, output_path, state_path, columns=INTERPOLATED_COLUMNS, max_gap=MAX_GAP
+):
+    # The state file remembers where the rows of the open gaps start in the output
+    # file, those rows as received and the anchors of the gaps, so only those rows
+    # are rewritten.
+    byte_offset, pending, anchors = _load_append_state(state_path)
+    if byte_offset and not os.path.exists(output_path):
+        raise ValueError(f"Found append state {state_path} without {output_path}")
+    interpolator = StreamingInterpolator(columns, max_gap)
+    interpolator.pending = pending
+    interpolator.anchors = anchors
+
+    settled = interpolator.update(df)
+    provisional = interpolator.provisional()
+
+    with open(output_path, "r+b" if byte_offset else "wb") as f:
+        f.seek(byte_offset)
+        f.truncate()
+        f.write(settled.to_csv(index=False, header=byte_offset == 0).encode())
+        byte_offset = f.tell()
+        if provisional is not None:
+            f.write(provisional.to_csv(index=False, header=False).encode())
+
+    _save_append_state(state_path, byte_offset, interpolator)
+    return len(settled) + (0 if provisional is None else len(provisional))
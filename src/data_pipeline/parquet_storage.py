@@ -0,0 +1,79 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.instrumentation.instrumentation import instrumented, length_of
+
+PARQUET_ROOT = "data/daily_system_data/parquet"
+
+STAGES = ("cleaned", "interpolated", "simulated")
+
+# Hive style directories, e.g. interpolated/tower=side_b/season=win23/part-0.parquet
+PARTITIONING = ds.partitioning(
+    pa.schema([("tower", pa.string()), ("season", pa.string())]), flavor="hive"
+)
+
+
+def _stage_path(root, stage):
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage {stage}. Expected one of {STAGES}.")
+    return os.path.join(root, stage)
+
+
+def _to_table(df):
+    # Store dates as timestamps and every other column as float64, instead of text
+    df = df.copy()
+    for col in df.columns:
+        if col == "date":
+            df[col] = pd.to_datetime(df[col])
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+@instrumented(rows=length_of(0, "df"))
+def write_stage(df, stage, tower, season, root=PARQUET_ROOT, compression="zstd"):
+    table = _to_table(df)
+    table = table.append_column("tower", pa.array([tower] * len(table), pa.string()))
+    table = table.append_column("season", pa.array([season] * len(table), pa.string()))
+
+    # Only the partition of this tower and season is replaced
+    ds.write_dataset(
+        table,
+        _stage_path(root, stage),
+        format="parquet",
+        partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching",
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+    )
+
+
+@instrumented()
+def read_stage(
+    stage, columns=None, tower=None, season=None, filter=None, root=PARQUET_ROOT
+):
+    dataset = ds.dataset(
+        _stage_path(root, stage), format="parquet", partitioning=PARTITIONING
+    )
+
+    # Partition filters prune whole directories, other predicates are pushed down to
+    # the Parquet row groups. Only the requested columns are read.
+    expression = filter
+    for name, value in (("tower", tower), ("season", season)):
+        if value is not None:
+            condition = ds.field(name) == value
+            expression = condition if expression is None else expression & condition
+    table = dataset.to_table(columns=columns, filter=expression)
+    df = table.to_pandas()
+    sort_columns = [col for col in ("tower", "season", "date") if col in df.columns]
+    if sort_columns:
+        df = df.sort_values(sort_columns, kind="stable").reset_index(drop=True)
+    return df
+
+
+def list_partitions(stage, root=PARQUET_ROOT):
+    # (tower, season) pairs stored for a stage, read from the partition columns only
+    partitions = read_stage(stage, columns=["tower", "season"], root=root)
+    return list(partitions.drop_duplicates().itertuples(index=False, name=None))
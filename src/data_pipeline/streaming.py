@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+from src.data_pipeline.cleaning import clean_daily_system_data
+from src.data_pipeline.interpolation import INTERPOLATED_COLUMNS, StreamingInterpolator
+from src.instrumentation.instrumentation import instrumented, length_of
+from src.linear_control_system.linear_control_system import LinearControlSystem
+from src.linear_control_system.simulation import simulate_dataframe
+
+
+def read_chunks(path, chunksize=10_000):
+    yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def clean_chunks(chunks, year=2023):
+    for chunk in chunks:
+        yield clean_daily_system_data(chunk, year=year)
+
+
+def interpolate_chunks(chunks, columns=INTERPOLATED_COLUMNS):
+    interpolator = StreamingInterpolator(columns)
+    for chunk in chunks:
+        interpolated = interpolator.update(chunk)
+        if not interpolated.empty:
+            yield interpolated
+    remaining = interpolator.flush()
+    if remaining is not None:
+        yield remaining
+
+
+class StreamingSimulator:
+    def __init__(
+        self,
+        A,
+        B,
+        C,
+        D,
+        input_columns=INPUT_COLUMNS,
+        output_columns=OUTPUT_COLUMNS,
+    ):
+        self.system = LinearControlSystem(A, B, np.zeros(A.shape[0]), C, D)
+        self.input_columns = list(input_columns)
+        self.output_columns = list(output_columns)
+        self.initialized = False
+
+    @property
+    def C(self):
+        return self.system.C
+
+    @property
+    def D(self):
+        return self.system.D
+
+    @instrumented(rows=length_of(1, "df"))
+    def simulate(self, df):
+        # The state is carried across calls, so the rows may arrive in any number of
+        # chunks. Only the first chunk estimates the initial state.
+        x = None if not self.initialized else self.system.x
+        simulated_df = simulate_dataframe(
+            self.system,
+            df,
+            self.input_columns,
+            self.output_columns,
+            x=x,
+        )
+        self.initialized = self.initialized or len(df) > 0
+        return simulated_df
+
+
+def select_columns(chunks, columns):
+    for chunk in chunks:
+        yield chunk[columns]
+
+
+def simulate_chunks(chunks, simulator):
+    for chunk in chunks:
+        yield simulator.simulate(chunk)
+
+
+def write_csv_chunks(chunks, path):
+    # Write each chunk as soon as it is produced, with the header only once
+    num_rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, index=False, mode="w" if i == 0 else "a", header=i == 0)
+        num_rows += len(chunk)
+    return num_rows
+
+
+def run_streaming_pipeline(
+    raw_path, output_path, weights_path, year=2023, chunksize=10_000
+):
+    with np.load(weights_path) as weights:
+        simulator = StreamingSimulator(
+            weights["A"], weights["B"], weights["C"], weights["D"]
+        )
+    chunks = read_chunks(raw_path, chunksize=chunksize)
+    chunks = clean_chunks(chunks, year=year)
+    chunks = interpolate_chunks(chunks)
+    # The simulated stage has the same columns as written by indoor-farm simulate
+    chunks = select_columns(chunks, ["date"] + OUTPUT_COLUMNS + INPUT_COLUMNS)
+    chunks = simulate_chunks(chunks, simulator)
+    return write_csv_chunks(chunks, output_path)
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Columns of the manually recorded daily logs, e.g.
+# win23_subset_zip_grow_tower_side_b_manual_mod.csv
+RAW_COLUMNS = [
+    "Date",
+    "Initial EC",
+    "Initial pH",
+    "Initial Nutrient Solution Volume",
+    "Final EC",
+    "Final pH",
+    "Final Nutrient Solution Volume",
+    "Comments",
+    "Type of pH Adjustment",
+    "Amount of pH Adjustment Used",
+    "Type of EC Adjustment",
+    "Amount of EC Adjustment Used",
+]
+
+# Free-text spellings found in the recorded logs
+PH_ADJUSTMENT_TYPES = ["pH Down", "pH Up"]
+PH_AMOUNT_FORMATS = ["{}mL", "{} mL", "{}ml"]
+EC_ADJUSTMENT_TYPES = [
+    "Water",
+    "Immature, No Water",
+    "Mature, No Water",
+    "1/2 Immature, 1/2 Water",
+    "1/2 Immature, 1/2 Mature",
+    "3/4 Mature, 1/4 Water",
+]
+EC_AMOUNTS = ["1 gal", "1gal", "1/2 gal", "0.5 gal", "1.5 gal", "2 gal", "2.5 gal"]
+COMMENTS = ["Water EC Adjustment (1 gal)", "1/2 : 1/2 ratio"]
+
+
+def _choice(rng, options, mask):
+    values = np.asarray(options, dtype=object)[
+        rng.integers(len(options), size=len(mask))
+    ]
+    return np.where(mask, values, None)
+
+
+def generate_daily_system_log(num_days=365, start="2023-01-26", seed=None):
+    # Synthetic daily log in the format of the manually recorded logs: dates as
+    # "month/day" without a year, free-text adjustments, "unmeasured" and blank
+    # readings, and a few days that were not recorded at all. Logs longer than a
+    # year repeat the month/day dates, as the year only comes from the season.
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=num_days, freq="D")
+    # Leap days are left out, since the cleaned date takes its year from the season
+    dates = dates[~((dates.month == 2) & (dates.day == 29))]
+    recorded = rng.random(len(dates)) > 0.03
+    recorded[[0, -1]] = True
+    dates = dates[recorded]
+    num_rows = len(dates)
+
+    # Slowly drifting measurements with the resolution of the recorded values
+    ec = np.round(2200 + lfilter([1.0], [1.0, -0.9], rng.normal(0, 60, num_rows)))
+    ph = np.round(
+        6.2 + 0.15 * np.sin(np.arange(num_rows) / 5) + rng.normal(0, 0.05, num_rows), 2
+    )
+    volume = np.round(2 * (5.5 + rng.normal(0, 0.3, num_rows))) / 2
+
+    initial_missing = rng.random(num_rows) < 0.08
+    initial_missing[[0, -1]] = False
+    final_missing = rng.random(num_rows) < 0.4
+    unmeasured = rng.random(num_rows) < 0.03
+
+    def measurements(values, missing, final=False):
+        column = values.astype(object)
+        column[missing] = None
+        if final:
+            column[unmeasured] = "unmeasured"
+        return column
+
+    ph_adjusted = rng.random(num_rows) < 0.3
+    ph_amounts = np.array(
+        [
+            fmt.format(amount)
+            for fmt, amount in zip(
+                rng.choice(PH_AMOUNT_FORMATS, num_rows),
+                rng.choice(["1", "2", "3", "3.5", "4", "5", "6", "7"], num_rows),
+            )
+        ],
+        dtype=object,
+    )
+    ec_adjusted = rng.random(num_rows) < 0.45
+    ec_amounts = _choice(rng, EC_AMOUNTS, ec_adjusted)
+    ec_amounts[ec_adjusted & (rng.random(num_rows) < 0.02)] = "ADD WATER"
+
+    return pd.DataFrame(
+        {
+            "Date": [f"{date.month}/{date.day}" for date in dates],
+            "Initial EC": measurements(ec, initial_missing),
+            "Initial pH": measurements(ph, initial_missing),
+            "Initial Nutrient Solution Volume": measurements(volume, initial_missing),
+            "Final EC": measurements(ec, final_missing, final=True),
+            "Final pH": measurements(ph, final_missing, final=True),
+            "Final Nutrient Solution Volume": measurements(volume + 0.5, final_missing),
+            "Comments": _choice(rng, COMMENTS, rng.random(num_rows) < 0.05),
+            "Type of pH Adjustment": _choice(rng, PH_ADJUSTMENT_TYPES, ph_adjusted),
+            "Amount of pH Adjustment Used": np.where(ph_adjusted, ph_amounts, None),
+            "Type of EC Adjustment": _choice(rng, EC_ADJUSTMENT_TYPES, ec_adjusted),
+            "Amount of EC Adjustment Used": ec_amounts,
+        },
+        columns=RAW_COLUMNS,
+    )
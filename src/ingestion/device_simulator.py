@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pandas as pd
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+
+SIMULATED_PATH = (
+    "data/daily_system_data/win23_subset_zip_grow_tower_side_b_simulated.csv"
+)
+
+
+def load_trajectory(
+    path=SIMULATED_PATH, input_columns=INPUT_COLUMNS, output_columns=OUTPUT_COLUMNS
+):
+    # Simulated outputs are replayed as the readings of a device, with the doses
+    # that were applied on each day
+    df = pd.read_csv(path)
+    trajectory = df[input_columns].copy()
+    for col in output_columns:
+        trajectory[col] = df["sim_" + col]
+    trajectory["time"] = pd.to_datetime(df["date"]).astype("int64") // 10**9
+    return trajectory
+
+
+def encode_readings(tower, trajectory):
+    # JSON lines of one device, encoded once so replaying costs only socket writes
+    records = trajectory.to_dict(orient="records")
+    return [
+        (json.dumps({"tower": tower, **record}) + "\n").encode() for record in records
+    ]
+
+
+async def replay_device(host, port, lines, rate=None, repeats=1, drain_every=100):
+    # Send the readings of one device, at most rate readings per second. Awaiting
+    # drain lets the service slow the device down when it falls behind.
+    _, writer = await asyncio.open_connection(host, port)
+    interval = None if rate is None else 1 / rate
+    num_sent = 0
+    try:
+        for _ in range(repeats):
+            for line in lines:
+                writer.write(line)
+                num_sent += 1
+                if num_sent % drain_every == 0:
+                    await writer.drain()
+                if interval is not None:
+                    await writer.drain()
+                    await asyncio.sleep(interval)
+        await writer.drain()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return num_sent
+
+
+async def replay_devices(
+    host,
+    port,
+    num_devices,
+    trajectory=None,
+    rate=None,
+    repeats=1,
+    tower_prefix="device",
+):
+    # Many fake devices replaying the same trajectory concurrently, each on its own
+    # connection and with its own tower name
+    if trajectory is None:
+        trajectory = load_trajectory()
+    sent = await asyncio.gather(
+        *(
+            replay_device(
+                host,
+                port,
+                encode_readings(f"{tower_prefix}_{i}", trajectory),
+                rate=rate,
+                repeats=repeats,
+            )
+            for i in range(num_devices)
+        )
+    )
+    return sum(sent)
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+from src.linear_control_system.linear_control_system import LinearControlSystem
+from src.state_estimation.kalman_filter import BatchedKalmanFilter, KalmanFilter
+
+
+def kalman_filter_factory(A, B, C, D, covariance):
+    # Estimator factory for towers sharing one identified model. The DARE is solved
+    # once, and every tower gets a copy of the filter started from the least squares
+    # state of its first reading.
+    system = LinearControlSystem(A, B, np.zeros(A.shape[0]), C, D)
+    kalman_filter = KalmanFilter.from_noise_covariance(system, covariance)
+
+    def create(tower, u, y):
+        observed = ~np.isnan(y)
+        x = np.linalg.pinv(C[observed]) @ (y[observed] - D[observed] @ u)
+        return kalman_filter.copy(x)
+
+    return create
+
+
+def parse_reading(line, input_columns=INPUT_COLUMNS, output_columns=OUTPUT_COLUMNS):
+    # One JSON object per line, e.g.
+    # {"tower": "side_b", "time": 1674691200, "initial_ec": 1938, "initial_ph": 6.5}
+    # Missing readings become NaN and missing inputs, absent, null or NaN, are taken
+    # as no dose.
+    message = json.loads(line)
+    tower = str(message["tower"])
+    reading_time = float(message.get("time", time.time()))
+    u = np.array([message.get(col) for col in input_columns], dtype=float)
+    u[np.isnan(u)] = 0.0
+    y = np.array(
+        [
+            np.nan if message.get(col) is None else message[col]
+            for col in output_columns
+        ],
+        dtype=float,
+    )
+    return tower, reading_time, u, y
+
+
+class IngestionService:
+    def __init__(
+        self,
+        estimator_factory,
+        window=0.1,
+        max_queue_size=10_000,
+        max_batch_size=10_000,
+        input_columns=INPUT_COLUMNS,
+        output_columns=OUTPUT_COLUMNS,
+        on_batch=None,
+    ):
+        self.estimator_factory = estimator_factory
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.input_columns = list(input_columns)
+        self.output_columns = list(output_columns)
+        self.on_batch = on_batch
+
+        # Connections wait on the bounded queue when the estimators fall behind, so
+        # they stop reading their sockets and the devices are slowed down by TCP flow
+        # control instead of readings piling up in memory
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.estimators = {}
+        # Kalman filters are updated through the stacked filter, which holds their
+        # states, and the position of each tower in it
+        self._batched_filter = None
+        self._filter_index = {}
+        self.estimates = {}
+        self.num_readings = 0
+        self.num_rejected = 0
+        self.num_failed = 0
+        self.num_batches = 0
+        self.last_error = None
+        self._server = None
+        self._worker = None
+        self._connections = set()
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        self._worker = asyncio.create_task(self._process_batches())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        # Stop accepting connections, wait for the open ones to be closed by their
+        # devices, then finish the readings already queued
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await asyncio.gather(*self._connections)
+        await self.queue.join()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def handle_connection(self, reader, writer):
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        try:
+            async for line in reader:
+                if not line.strip():
+                    continue
+                try:
+                    reading = parse_reading(
+                        line, self.input_columns, self.output_columns
+                    )
+                except (ValueError, KeyError, TypeError):
+                    self.num_rejected += 1
+                    continue
+                await self.queue.put(reading)
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(connection)
+            writer.close()
+
+    async def _next_batch(self):
+        # Everything that arrives within one window of the first reading, or until
+        # the batch is full
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _process_batches(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                self.process_batch(batch)
+            except Exception as error:
+                # Failing readings are counted by process_batch. Anything else, e.g.
+                # an error in on_batch, must not stop the only worker either, or the
+                # queue fills up and every connection blocks.
+                self.last_error = error
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def process_batch(self, batch):
+        # Readings of each tower are filtered in the order they arrived, in rounds
+        # of at most one reading per tower. The Kalman filters of all towers are
+        # stacked in one BatchedKalmanFilter, so the complete readings of a round
+        # are a single batched update.
+        rounds = []
+        num_seen = {}
+        for reading in batch:
+            k = num_seen.get(reading[0], 0)
+            num_seen[reading[0]] = k + 1
+            if k == len(rounds):
+                rounds.append([])
+            rounds[k].append(reading)
+
+        updated = {}
+        num_failed = self.num_failed
+        for readings in rounds:
+            self._process_round(readings, updated)
+        self.estimates.update(updated)
+        self.num_readings += len(batch) - (self.num_failed - num_failed)
+        self.num_batches += 1
+        if self.on_batch is not None:
+            self.on_batch(updated)
+        return updated
+
+    def _fail(self, error):
+        # A reading that cannot be filtered, e.g. a DARE that fails for the model of
+        # a new tower, is counted and dropped without affecting the other towers
+        self.num_failed += 1
+        self.last_error = error
+
+    def _process_round(self, readings, updated):
+        new_filters = []
+        ready = []
+        for reading in readings:
+            tower, _, u, y = reading
+            if tower not in self.estimators:
+                try:
+                    estimator = self.estimator_factory(tower, u, y)
+                except Exception as error:
+                    self._fail(error)
+                    continue
+                self.estimators[tower] = estimator
+                if isinstance(estimator, KalmanFilter):
+                    new_filters.append((tower, estimator))
+            ready.append(reading)
+
+        if new_filters:
+            filters = [estimator for _, estimator in new_filters]
+            if self._batched_filter is None:
+                self._batched_filter = BatchedKalmanFilter(filters)
+                indices = range(len(filters))
+            else:
+                indices = self._batched_filter.add(filters)
+            for (tower, _), i in zip(new_filters, indices):
+                self._filter_index[tower] = i
+
+        # Complete readings of stacked filters in one update, the others one by one
+        complete = [
+            reading
+            for reading in ready
+            if reading[0] in self._filter_index and not np.isnan(reading[3]).any()
+        ]
+        if complete:
+            try:
+                filtered = self._batched_filter.update(
+                    np.array([reading[2] for reading in complete]),
+                    np.array([reading[3] for reading in complete]),
+                    [self._filter_index[reading[0]] for reading in complete],
+                )
+            except Exception as error:
+                for _ in complete:
+                    self._fail(error)
+            else:
+                for (tower, reading_time, _, _), estimate in zip(complete, filtered):
+                    updated[tower] = (reading_time, estimate)
+
+        complete_towers = {reading[0] for reading in complete}
+        for tower, reading_time, u, y in ready:
+            if tower in complete_towers:
+                continue
+            try:
+                if tower in self._filter_index:
+                    estimate = self._batched_filter.update_one(
+                        self._filter_index[tower], u, y
+                    )
+                else:
+                    estimate = self.estimators[tower].update(u, y)
+            except Exception as error:
+                self._fail(error)
+                continue
+            updated[tower] = (reading_time, estimate)
@@ -0,0 +1,278 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Setting INDOOR_FARM_INSTRUMENTATION to 1 enables timing from the start of a run and
+# "memory" also tracks peak memory. With INDOOR_FARM_METRICS_PATH set, the metrics
+# are written there at exit, as Prometheus text for .prom files and JSON otherwise.
+ENABLE_VARIABLE = "INDOOR_FARM_INSTRUMENTATION"
+METRICS_PATH_VARIABLE = "INDOOR_FARM_METRICS_PATH"
+
+PROMETHEUS_PREFIX = "indoor_farm"
+
+
+class _SpanMetrics:
+    __slots__ = ("calls", "seconds", "max_seconds", "rows", "steps", "peak_memory")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.steps = 0
+        self.peak_memory = None
+
+    def to_dict(self):
+        metrics = {
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "max_seconds": self.max_seconds,
+        }
+        # Rates only for spans that count rows or time steps
+        for key, count in (("rows", self.rows), ("steps", self.steps)):
+            if count:
+                metrics[key] = count
+                metrics[key + "_per_second"] = count / self.seconds
+        if self.peak_memory is not None:
+            metrics["peak_memory_bytes"] = self.peak_memory
+        return metrics
+
+
+class _Recorder:
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self.spans = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+
+_recorder = _Recorder()
+
+
+def enable(track_memory=False):
+    _recorder.track_memory = track_memory
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _recorder.enabled = True
+
+
+def disable():
+    _recorder.enabled = False
+    if _recorder.track_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _recorder.track_memory = False
+
+
+def is_enabled():
+    return _recorder.enabled
+
+
+def reset():
+    with _recorder.lock:
+        _recorder.spans.clear()
+
+
+def _memory_stack():
+    stack = getattr(_recorder.local, "memory_stack", None)
+    if stack is None:
+        stack = _recorder.local.memory_stack = []
+    return stack
+
+
+def _record(name, seconds, rows, steps, peak_memory):
+    with _recorder.lock:
+        metrics = _recorder.spans.get(name)
+        if metrics is None:
+            metrics = _recorder.spans[name] = _SpanMetrics()
+        metrics.calls += 1
+        metrics.seconds += seconds
+        metrics.max_seconds = max(metrics.max_seconds, seconds)
+        metrics.rows += int(rows)
+        metrics.steps += int(steps)
+        if peak_memory is not None:
+            metrics.peak_memory = max(metrics.peak_memory or 0, peak_memory)
+
+
+class _Span:
+    __slots__ = ("name", "rows", "steps", "start", "memory")
+
+    def __init__(self, name, rows=0, steps=0):
+        self.name = name
+        self.rows = rows
+        self.steps = steps
+
+    def __enter__(self):
+        # The tracemalloc peak is reset for every span, so the peak seen by inner
+        # spans is carried over to the span that encloses them
+        self.memory = _recorder.track_memory and tracemalloc.is_tracing()
+        if self.memory:
+            stack = _memory_stack()
+            if stack:
+                stack[-1] = max(stack[-1], tracemalloc.get_traced_memory()[1])
+            stack.append(0)
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        peak_memory = None
+        if self.memory:
+            stack = _memory_stack()
+            peak_memory = max(stack.pop(), tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1] = max(stack[-1], peak_memory)
+        _record(self.name, seconds, self.rows, self.steps, peak_memory)
+        return False
+
+
+class _DisabledSpan:
+    # Shared stand-in while disabled. Counts set on it inside a block are ignored.
+    rows = 0
+    steps = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_DISABLED_SPAN = _DisabledSpan()
+
+
+def span(name, rows=0, steps=0):
+    # Time a block of code. Rows and steps can also be set on the returned span
+    # inside the block, once they are known.
+    if not _recorder.enabled:
+        return _DISABLED_SPAN
+    return _Span(name, rows, steps)
+
+
+def instrumented(name=None, rows=None, steps=None):
+    # Decorator timing every call of a function. rows and steps are fixed counts per
+    # call, or callables that count the processed rows or time steps from the
+    # arguments of the call. When instrumentation is disabled, the only cost is
+    # checking that it is.
+    count_rows = _counter(rows)
+    count_steps = _counter(steps)
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _recorder.enabled:
+                return func(*args, **kwargs)
+            with _Span(
+                span_name, count_rows(*args, **kwargs), count_steps(*args, **kwargs)
+            ):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _counter(count):
+    if callable(count):
+        return count
+    return lambda *args, **kwargs: count or 0
+
+
+def length_of(position, keyword=None):
+    # Counter for instrumented: the length of one argument, e.g. the rows of a
+    # DataFrame or the time steps of an input sequence
+    def count(*args, **kwargs):
+        if position < len(args):
+            return len(args[position])
+        return len(kwargs[keyword]) if keyword in kwargs else 0
+
+    return count
+
+
+def to_dict():
+    with _recorder.lock:
+        return {name: metrics.to_dict() for name, metrics in _recorder.spans.items()}
+
+
+def export_json(path=None):
+    text = json.dumps(to_dict(), indent=2, sort_keys=True)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    return text
+
+
+def _prometheus_label(name):
+    return name.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Prometheus metric name, type, help text and key of the exported span metrics
+PROMETHEUS_METRICS = [
+    ("span_calls_total", "counter", "Number of calls of the span", "calls"),
+    ("span_seconds_total", "counter", "Total time spent in the span", "seconds"),
+    ("span_max_seconds", "gauge", "Longest single call of the span", "max_seconds"),
+    ("span_rows_total", "counter", "Rows processed in the span", "rows"),
+    ("span_steps_total", "counter", "Time steps simulated in the span", "steps"),
+    ("span_rows_per_second", "gauge", "Rows processed per second", "rows_per_second"),
+    (
+        "span_steps_per_second",
+        "gauge",
+        "Time steps simulated per second",
+        "steps_per_second",
+    ),
+    (
+        "span_peak_memory_bytes",
+        "gauge",
+        "Peak traced memory during the span",
+        "peak_memory_bytes",
+    ),
+]
+
+
+def export_prometheus(path=None):
+    spans = to_dict()
+    lines = []
+    for metric, metric_type, help_text, key in PROMETHEUS_METRICS:
+        samples = [
+            (name, metrics[key])
+            for name, metrics in sorted(spans.items())
+            if key in metrics
+        ]
+        if not samples:
+            continue
+        full_name = f"{PROMETHEUS_PREFIX}_{metric}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        for name, value in samples:
+            lines.append(f'{full_name}{{span="{_prometheus_label(name)}"}} {value!r}')
+    text = "\n".join(lines) + "\n"
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
+
+
+def export(path):
+    if path.endswith(".prom"):
+        return export_prometheus(path)
+    return export_json(path)
+
+
+def _configure_from_environment():
+    setting = os.environ.get(ENABLE_VARIABLE, "").lower()
+    if setting in ("", "0", "false", "no"):
+        return
+    enable(track_memory=setting == "memory")
+    path = os.environ.get(METRICS_PATH_VARIABLE)
+    if path:
+        atexit.register(export, path)
+
+
+_configure_from_environment()
@@ -0,0 +1,88 @@
+import numpy as np
+
+from src.instrumentation.instrumentation import instrumented, length_of
+
+
+class BatchedLinearControlSystem:
+    def __init__(self, A=None, B=None, x=None):
+        self.A = np.asarray(A)
+        self.B = np.asarray(B)
+        self.x = np.asarray(x)
+
+        # Check dimensions. A is (N, n, n), B is (N, n, m) and x is (N, n), or
+        # (N, n, k) for k trajectories of every system.
+        if self.A.ndim != 3 or self.B.ndim != 3 or self.x.ndim not in (2, 3):
+            raise ValueError(
+                "A and B must be 3-dimensional and x must be 2 or 3-dimensional"
+            )
+        if self.A.shape[1] != self.A.shape[2]:
+            raise ValueError("Each A in the batch must be square")
+        if self.B.shape[:2] != self.A.shape[:2]:
+            raise ValueError(
+                "Number of systems and rows in B must match number of systems and rows in A"
+            )
+        if self.x.shape[:2] != self.A.shape[:2]:
+            raise ValueError(
+                "Number of systems and rows in x must match number of systems and "
+                "columns in A"
+            )
+
+    @classmethod
+    def from_systems(cls, systems):
+        # Stack individual LinearControlSystem objects that share the same dimensions
+        A = np.stack([system.A for system in systems])
+        B = np.stack([system.B for system in systems])
+        x = np.stack([np.asarray(system.x).reshape(-1) for system in systems])
+        return cls(A, B, x)
+
+    @property
+    def num_systems(self):
+        return self.A.shape[0]
+
+    def calculate_next_state(self, u):
+        u = np.asarray(u)
+        if u.shape != (self.num_systems, self.B.shape[2]) + self.x.shape[2:]:
+            raise ValueError(
+                "u must have one row per system and one column per column of B"
+            )
+
+        next_x = np.einsum("nij,nj...->ni...", self.A, self.x) + np.einsum(
+            "nij,nj...->ni...", self.B, u
+        )
+        self.x = next_x
+        return next_x
+
+    @instrumented(steps=length_of(1, "U"))
+    def simulate(self, U):
+        # U is (T, N, m), or (T, N, m, k) for k trajectories of every system
+        U = np.asarray(U)
+        shape = (self.num_systems, self.B.shape[2]) + self.x.shape[2:]
+        if U.ndim != self.x.ndim + 1 or U.shape[1:] != shape:
+            raise ValueError(
+                "U must have shape (T, number of systems, columns of B), followed by "
+                "the number of trajectories of x"
+            )
+
+        # A single trajectory is one column, so every step is one (n x n) by (n x k)
+        # product per system
+        columns = self.x.ndim == 3
+        x = self.x if columns else self.x[..., None]
+        U = U if columns else U[..., None]
+
+        # Preallocate the whole trajectory, with the current state as the first entry
+        num_steps = U.shape[0]
+        dtype = np.result_type(self.A, self.B, self.x, U)
+        trajectory = np.empty((num_steps + 1,) + x.shape, dtype=dtype)
+        trajectory[0] = x
+
+        # The input contribution of every step is independent of the state, so it is
+        # computed for the whole horizon in a single call.
+        input_contribution = np.matmul(self.B, U)
+        for t in range(num_steps):
+            np.matmul(self.A, trajectory[t], out=trajectory[t + 1])
+            trajectory[t + 1] += input_contribution[t]
+
+        if not columns:
+            trajectory = trajectory[..., 0]
+        self.x = trajectory[-1].copy()
+        return trajectory
@@ -1,45 +1,294 @@
+import functools
+
 import numpy as np
 
+from src.instrumentation.instrumentation import instrumented, length_of
+
+
+def _memoized(method):
+    # Cache the result of an analysis of A, B and C until one of them is reassigned.
+    # Results are made read-only, so callers cannot change the cached arrays.
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        cached = self._analysis_cache.get(key)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        result = _read_only(method(self, *args, **kwargs))
+        self._analysis_cache[key] = (self._version, result)
+        return result
+
+    return wrapper
+
+
+def _read_only(result):
+    if isinstance(result, np.ndarray):
+        result.setflags(write=False)
+    elif isinstance(result, tuple):
+        for item in result:
+            _read_only(item)
+    return result
+
 
 class LinearControlSystem:
-    def __init__(self, A=None, B=None, x=None):
+    # Fixed attributes keep large fleets of systems small in memory
+    __slots__ = (
+        "_A",
+        "_B",
+        "_C",
+        "_x",
+        "D",
+        "_version",
+        "_analysis_cache",
+        "_rollout_cache",
+        "_step_buffer",
+    )
+
+    def __init__(self, A=None, B=None, x=None, C=None, D=None):
+        self._version = 0
+        self._analysis_cache = {}
+        self._rollout_cache = None
+        self._step_buffer = None
         self.A = A
         self.B = B
         self.x = x
+        self.C = C
+        self.D = D
 
         # Check dimensions
         if B.shape[0] != A.shape[0]:
             raise ValueError("Number of rows in B must match number of rows in A")
         if A.shape[1] != x.shape[0]:
             raise ValueError("Number of columns in A must match number of rows in x")
+        if C is not None and C.shape[1] != A.shape[0]:
+            raise ValueError("Number of columns in C must match number of rows in A")
+        if D is not None and (C is None or D.shape != (C.shape[0], B.shape[1])):
+            raise ValueError(
+                "D must have the number of rows of C and the number of columns of B"
+            )
+
+    @property
+    def A(self):
+        return self._A
+
+    @A.setter
+    def A(self, A):
+        self._A = A
+        self._version += 1
+        self._analysis_cache = {}
+        self._rollout_cache = None
+        self._step_buffer = None
+
+    @property
+    def B(self):
+        return self._B
+
+    @B.setter
+    def B(self, B):
+        self._B = B
+        self._version += 1
+        self._analysis_cache = {}
+        self._rollout_cache = None
+        self._step_buffer = None
+
+    @property
+    def C(self):
+        return self._C
+
+    @C.setter
+    def C(self, C):
+        self._C = C
+        self._version += 1
+        self._analysis_cache = {}
+
+    @property
+    def version(self):
+        # Incremented whenever A, B or C is reassigned. Changing their entries in
+        # place is not tracked, so matrices should be replaced rather than modified.
+        return self._version
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, x):
+        # With the hot path enabled the state is copied into its fixed buffer, so
+        # step keeps writing to the same contiguous array
+        if self._step_buffer is not None:
+            self._x[...] = x
+        else:
+            self._x = x
+
+    def copy(self, x=None):
+        # System with the same matrices and its own state, e.g. for every user of a
+        # shared model. The matrices, the memoized analysis and the rollout cache are
+        # shared, since they are replaced rather than modified. A reassigned matrix
+        # only affects the system it was assigned to.
+        other = LinearControlSystem.__new__(LinearControlSystem)
+        other._A, other._B, other._C, other.D = self._A, self._B, self._C, self.D
+        other._version = self._version
+        other._analysis_cache = self._analysis_cache
+        other._rollout_cache = self._rollout_cache
+        other._step_buffer = None
+        other._x = np.array(self._x if x is None else x)
+        return other
 
     def calculate_next_state(self, u):
-        if not hasattr(self, "A") or not hasattr(self, "B") or not hasattr(self, "x"):
+        # Like step, this is called once per time step and is not instrumented. Steps
+        # are counted by rollout and the batch simulations instead. The matrices are
+        # read from their slots directly to skip the property calls.
+        if (
+            not hasattr(self, "_A")
+            or not hasattr(self, "_B")
+            or not hasattr(self, "_x")
+        ):
             raise ValueError(
                 "A, B, and x must be initialized before calling calculate_next_state"
             )
 
-        if self.B.shape[1] != u.shape[0]:
+        B = self._B
+        if B.shape[1] != u.shape[0]:
             raise ValueError("Number of columns of B must match number of rows in u")
 
-        next_x = np.dot(self.A, self.x) + np.dot(self.B, u)
+        next_x = np.dot(self._A, self._x) + np.dot(B, u)
         self.x = next_x
         return next_x
 
-    def compute_controllability_matrix(self):
+    def enable_hot_path(self, dtype=np.float64):
+        # Validate once and store A, B and x as contiguous arrays of one dtype, with
+        # a buffer for the intermediate product, so that step allocates nothing
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError("The hot path supports float32 and float64 only")
+        n = self.A.shape[0]
+        x = np.asarray(self.x).reshape(-1)
+        if self.A.shape != (n, n) or self.B.shape[0] != n or x.shape != (n,):
+            raise ValueError("A must be square and match the rows of B and x")
+        self.A = np.ascontiguousarray(self.A, dtype=dtype)
+        self.B = np.ascontiguousarray(self.B, dtype=dtype)
+        self._x = np.array(x, dtype=dtype)
+        self._step_buffer = np.empty(n, dtype=dtype)
+        return self
+
+    def step(self, u, out=None):
+        # In-place x = A x + B u without validation. u must be a contiguous vector of
+        # the hot path dtype. The returned state is the internal buffer, which the
+        # next step overwrites, unless out is given. Unlike the other methods, step is
+        # never instrumented.
+        buffer = self._step_buffer
+        if buffer is None:
+            raise ValueError("Call enable_hot_path before step")
+        x = self._x
+        self._A.dot(x, buffer)
+        self._B.dot(u, x)
+        x += buffer
+        if out is None:
+            return x
+        out[...] = x
+        return out
+
+    @instrumented()
+    def precompute_rollout(self, horizon):
+        if horizon < 1:
+            raise ValueError("Rollout horizon must be at least 1")
+
+        # Powers A^0, ..., A^horizon and the impulse responses A^0 B, ..., A^(horizon-1) B
+        n, m = self.B.shape
+        dtype = np.result_type(self.A, self.B, float)
+        A_powers = np.empty((horizon + 1, n, n), dtype=dtype)
+        A_powers[0] = np.eye(n)
+        for k in range(1, horizon + 1):
+            np.dot(self.A, A_powers[k - 1], out=A_powers[k])
+        A_powers_B = A_powers[:horizon] @ self.B
+
+        # Block-Toeplitz matrix mapping the stacked inputs u_0, ..., u_(horizon-1) to
+        # the stacked states x_1, ..., x_horizon. Block (i, j) is A^(i-j) B on and
+        # below the diagonal and zero above it, gathered in one indexing operation.
+        # The matrix holds horizon^2 n m entries, e.g. 120 MB for a horizon of 1000
+        # with n=3 and m=5, and takes twice that while it is built.
+        lags = np.subtract.outer(np.arange(horizon), np.arange(horizon))
+        blocks = A_powers_B[np.maximum(lags, 0)]
+        blocks[lags < 0] = 0
+        toeplitz = blocks.transpose(0, 2, 1, 3).reshape(horizon * n, horizon * m)
+
+        self._rollout_cache = {
+            "horizon": horizon,
+            "A_powers": A_powers,
+            "A_powers_B": A_powers_B,
+            "toeplitz": toeplitz,
+        }
+        return self._rollout_cache
+
+    def _get_rollout_cache(self, horizon):
+        if self._rollout_cache is None or self._rollout_cache["horizon"] < horizon:
+            return self.precompute_rollout(horizon)
+        return self._rollout_cache
+
+    def _validate_input_sequence(self, U):
+        U = np.asarray(U)
+        if U.ndim != 2 or U.shape[0] < 1 or U.shape[1] != self.B.shape[1]:
+            raise ValueError(
+                "U must have one row per time step and one column per column of B"
+            )
+        return U
+
+    @instrumented(steps=length_of(1, "U"))
+    def rollout(self, U):
+        U = self._validate_input_sequence(U)
+
+        # States x_0, ..., x_T for the inputs u_0, ..., u_(T-1), without modifying x
+        num_steps = U.shape[0]
+        n, m = self.B.shape
+        cache = self._get_rollout_cache(num_steps)
+        x = np.asarray(self.x).reshape(-1)
+        trajectory = np.empty((num_steps + 1, n), dtype=cache["toeplitz"].dtype)
+        trajectory[0] = x
+        trajectory[1:] = cache["A_powers"][1 : num_steps + 1] @ x
+        trajectory[1:] += (
+            cache["toeplitz"][: num_steps * n, : num_steps * m] @ U.reshape(-1)
+        ).reshape(num_steps, n)
+        return trajectory
+
+    @instrumented(steps=length_of(1, "U"))
+    def rollout_final_state(self, U):
+        U = self._validate_input_sequence(U)
+
+        # x_T = A^T x_0 + sum_k A^(T-1-k) B u_k
+        num_steps = U.shape[0]
+        cache = self._get_rollout_cache(num_steps)
+        x = np.asarray(self.x).reshape(-1)
+        return cache["A_powers"][num_steps] @ x + np.einsum(
+            "kij,kj->i", cache["A_powers_B"][num_steps - 1 :: -1], U
+        )
+
+    @_memoized
+    @instrumented()
+    def compute_controllability_matrix(self, rank_only=False, tol=None):
         if not hasattr(self, "A") or not hasattr(self, "B"):
             raise ValueError("Matrices A and B must be defined.")
 
         n = self.A.shape[0]
-        controllability_matrix = self.B
+        if rank_only:
+            rank = _krylov_rank(self.B, lambda block: self.A @ block, n, tol=tol)
+            return rank, rank == n
+
+        # Fill [B, AB, ..., A^(n-1)B] in place using A^i B = A (A^(i-1) B)
+        m = self.B.shape[1]
+        controllability_matrix = np.empty(
+            (n, n * m), dtype=np.result_type(self.A, self.B)
+        )
+        controllability_matrix[:, :m] = self.B
         for i in range(1, n):
-            controllability_matrix = np.hstack(
-                (controllability_matrix, np.linalg.matrix_power(self.A, i) @ self.B)
+            controllability_matrix[:, i * m : (i + 1) * m] = (
+                self.A @ controllability_matrix[:, (i - 1) * m : i * m]
             )
-        rank = np.linalg.matrix_rank(controllability_matrix)
+        rank = np.linalg.matrix_rank(controllability_matrix, tol=tol)
         controllable = rank == n
         return controllability_matrix, rank, controllable
 
+    @_memoized
+    @instrumented()
     def compute_A_eigen(self):
         if not hasattr(self, "A"):
             raise ValueError("Matrices A must be defined.")
@@ -47,19 +296,149 @@ class LinearControlSystem:
         eigenvalues, eigenvectors = np.linalg.eig(self.A)
         return eigenvalues, eigenvectors
 
-    def compute_observability_matrix(self):
-        if not hasattr(self, "C"):
+    @_memoized
+    @instrumented()
+    def compute_observability_matrix(self, rank_only=False, tol=None):
+        if getattr(self, "C", None) is None:
             raise ValueError("Matrix C must be defined.")
 
         n = self.A.shape[0]
-        observability_matrix = self.C
+        if rank_only:
+            # The observability rank of (A, C) is the controllability rank of (A^T, C^T)
+            rank = _krylov_rank(self.C.T, lambda block: self.A.T @ block, n, tol=tol)
+            return rank, rank == n
+
+        # Fill [C; CA; ...; CA^(n-1)] in place using C A^i = (C A^(i-1)) A
+        p = self.C.shape[0]
+        observability_matrix = np.empty(
+            (n * p, n), dtype=np.result_type(self.A, self.C)
+        )
+        observability_matrix[:p] = self.C
         for i in range(1, n):
-            observability_matrix = np.vstack(
-                (
-                    observability_matrix,
-                    np.dot(np.linalg.matrix_power(self.A, i), self.C),
-                )
+            observability_matrix[i * p : (i + 1) * p] = (
+                observability_matrix[(i - 1) * p : i * p] @ self.A
             )
-        rank = np.linalg.matrix_rank(observability_matrix)
+        rank = np.linalg.matrix_rank(observability_matrix, tol=tol)
         observable = rank == n
         return observability_matrix, rank, observable
+
+    def compute_spectral_radius(self):
+        eigenvalues, _ = self.compute_A_eigen()
+        return np.max(np.abs(eigenvalues))
+
+    def is_stable(self):
+        return self.compute_spectral_radius() < 1
+
+    def _check_stable(self):
+        spectral_radius = self.compute_spectral_radius()
+        if spectral_radius >= 1:
+            raise ValueError(
+                "Gramians are only defined for stable A, the spectral radius is "
+                f"{spectral_radius:.4g}"
+            )
+
+    @_memoized
+    @instrumented()
+    def compute_controllability_gramian(self):
+        if not hasattr(self, "A") or not hasattr(self, "B"):
+            raise ValueError("Matrices A and B must be defined.")
+        self._check_stable()
+
+        # W_c = A W_c A^T + B B^T. The bilinear method maps the equation to a
+        # continuous Lyapunov equation solved with Bartels-Stewart on the Schur form.
+        B = np.asarray(self.B, dtype=float)
+        gramian = _solve_discrete_lyapunov(self.A, B @ B.T)
+        return (gramian + gramian.T) / 2
+
+    @_memoized
+    @instrumented()
+    def compute_observability_gramian(self):
+        if getattr(self, "C", None) is None:
+            raise ValueError("Matrix C must be defined.")
+        self._check_stable()
+
+        # W_o = A^T W_o A + C^T C
+        C = np.asarray(self.C, dtype=float)
+        gramian = _solve_discrete_lyapunov(self.A.T, C.T @ C)
+        return (gramian + gramian.T) / 2
+
+    @_memoized
+    def compute_hankel_singular_values(self):
+        factor_c = _gramian_factor(self.compute_controllability_gramian())
+        factor_o = _gramian_factor(self.compute_observability_gramian())
+        return np.linalg.svd(factor_o.T @ factor_c, compute_uv=False)
+
+    @instrumented()
+    def balanced_truncation(self, order=None, tol=1e-3):
+        # Square root balanced truncation. The balancing transformation makes both
+        # Gramians equal to the diagonal of Hankel singular values, and the states
+        # with the smallest values, which are hard to both reach and observe, are
+        # dropped. Without an order, the states with singular values above tol times
+        # the largest one are kept.
+        factor_c = _gramian_factor(self.compute_controllability_gramian())
+        factor_o = _gramian_factor(self.compute_observability_gramian())
+        U, hankel_singular_values, Vt = np.linalg.svd(factor_o.T @ factor_c)
+        if order is None:
+            order = int(
+                np.sum(hankel_singular_values > tol * hankel_singular_values[0])
+            )
+        if not 1 <= order <= np.sum(hankel_singular_values > 0):
+            raise ValueError(
+                "The order must be at least 1 and at most the number of nonzero Hankel "
+                "singular values"
+            )
+
+        scale = 1 / np.sqrt(hankel_singular_values[:order])
+        T = factor_c @ Vt[:order].T * scale
+        T_inverse = scale[:, None] * U[:, :order].T @ factor_o.T
+        reduced_system = LinearControlSystem(
+            T_inverse @ self.A @ T,
+            T_inverse @ self.B,
+            T_inverse @ np.asarray(self.x, dtype=float).reshape(-1),
+            self.C @ T,
+            self.D,
+        )
+        return reduced_system, hankel_singular_values
+
+
+def _krylov_rank(first_block, next_block, n, tol=None):
+    # Rank of [K, next_block(K), next_block(next_block(K)), ...] for at most n blocks.
+    # Each block is projected onto the orthogonal complement of the directions found
+    # so far and only its new directions are kept, so the search stops as soon as the
+    # rank is full or a block adds nothing new (after which no later block can).
+    basis = np.empty((n, n))
+    rank = 0
+    block = np.asarray(first_block, dtype=float)
+    threshold = tol
+    for _ in range(n):
+        residual = block - basis[:, :rank] @ (basis[:, :rank].T @ block)
+        left_vectors, singular_values, _ = np.linalg.svd(residual, full_matrices=False)
+        if threshold is None:
+            largest = singular_values.max(initial=0.0)
+            threshold = largest * max(n, block.shape[1]) * np.finfo(float).eps
+        new_directions = left_vectors[:, singular_values > threshold]
+        num_new = min(new_directions.shape[1], n - rank)
+        if num_new == 0:
+            break
+        basis[:, rank : rank + num_new] = new_directions[:, :num_new]
+        rank += num_new
+        if rank == n:
+            break
+        block = next_block(block)
+    return rank
+
+
+def _solve_discrete_lyapunov(A, Q):
+    # scipy.linalg is only imported once a Gramian is needed, since importing it
+    # takes longer than most short simulation runs
+    from scipy.linalg import solve_discrete_lyapunov
+
+    return solve_discrete_lyapunov(A, Q, method="bilinear")
+
+
+def _gramian_factor(gramian):
+    # Square root factor L with L L^T equal to the Gramian. Gramians of systems that
+    # are not minimal are only semidefinite, so an eigendecomposition is used instead
+    # of a Cholesky factorization.
+    eigenvalues, eigenvectors = np.linalg.eigh(gramian)
+    return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from src.instrumentation.instrumentation import instrumented, length_of
+from src.linear_control_system.linear_control_system import LinearControlSystem
+
+
+def as_linear_control_system(model):
+    # Accept nfoursid StateSpace models as well as LinearControlSystem objects
+    if isinstance(model, LinearControlSystem):
+        if model.C is None:
+            raise ValueError("Matrix C must be defined to simulate outputs.")
+        return model
+    A = np.asarray(model.a)
+    return LinearControlSystem(A, model.b, np.zeros(A.shape[0]), model.c, model.d)
+
+
+def estimate_initial_state(system, u, y):
+    # Least squares state of the first measurement, y_0 = C x_0 + D u_0
+    y = np.asarray(y, dtype=float) - _feedthrough(system, len(u)) @ u
+    return np.linalg.pinv(system.C) @ y
+
+
+def _feedthrough(system, m):
+    if system.D is None:
+        return np.zeros((system.C.shape[0], m))
+    return system.D
+
+
+@instrumented(steps=length_of(1, "U"))
+def simulate_outputs(system, U, out=None):
+    # Outputs y_k = C x_k + D u_k with x_(k+1) = A x_k + B u_k for every row of U,
+    # starting from system.x and leaving system.x at the state after the last row.
+    # The input terms B u_k of all rows are one product, so the recursion only adds
+    # A x_k per step. Unlike rollout, it needs no setup that grows with the number
+    # of rows, which matters for the short logs of a single season.
+    U = np.asarray(U, dtype=float)
+    num_steps = U.shape[0]
+    if out is None:
+        out = np.empty((num_steps, system.C.shape[0]))
+    if out.shape != (num_steps, system.C.shape[0]):
+        raise ValueError(
+            "out must have one row per time step and one column per output"
+        )
+    if num_steps == 0:
+        return out
+
+    states = np.empty((num_steps + 1, system.A.shape[0]))
+    states[0] = np.asarray(system.x).reshape(-1)
+    np.matmul(U, np.asarray(system.B).T, out=states[1:])
+    A_T = np.asarray(system.A).T
+    for k in range(num_steps):
+        states[k + 1] += states[k] @ A_T
+    system.x = states[-1].copy()
+    np.matmul(states[:-1], system.C.T, out=out)
+    out += U @ _feedthrough(system, U.shape[1]).T
+    return out
+
+
+@instrumented(rows=length_of(1, "df"))
+def simulate_dataframe(model, df, input_columns, output_columns, x=None, prefix="sim_"):
+    system = as_linear_control_system(model)
+    inputs = df[input_columns].to_numpy(dtype=float)
+    if len(output_columns) != system.C.shape[0]:
+        raise ValueError("Number of output columns must match number of rows of C")
+    if x is None and len(df):
+        x = estimate_initial_state(
+            system, inputs[0], df[output_columns].iloc[0].to_numpy(dtype=float)
+        )
+    if x is not None:
+        system.x = np.asarray(x, dtype=float).reshape(-1)
+
+    # The outputs are written straight into one preallocated array, which becomes
+    # the simulated columns in front of the original columns
+    sim_columns = [prefix + col for col in output_columns]
+    simulated = np.empty((len(df), len(output_columns)))
+    simulate_outputs(system, inputs, out=simulated)
+    simulated_df = pd.DataFrame(simulated, columns=sim_columns, index=df.index)
+    return pd.concat([simulated_df, df], axis=1)
@@ -0,0 +1,148 @@
+import numpy as np
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS, TARGET_BANDS
+from src.instrumentation.instrumentation import instrumented
+
+# Largest daily dose of each actuator
+INPUT_BOUNDS = {
+    "pH_down_mL": (0, 10),
+    "pH_up_mL": (0, 10),
+    "nutrient_mature_gallons": (0, 3),
+    "nutrient_immature_gallons": (0, 3),
+    "water_gallons": (0, 3),
+}
+
+
+class ModelPredictiveController:
+    def __init__(
+        self,
+        system,
+        C,
+        D,
+        horizon=7,
+        input_columns=INPUT_COLUMNS,
+        output_columns=OUTPUT_COLUMNS,
+        target_bands=TARGET_BANDS,
+        input_bounds=INPUT_BOUNDS,
+        band_weight=1.0,
+        input_weight=1e-3,
+        max_iterations=50,
+        tolerance=1e-6,
+    ):
+        n, m = system.B.shape
+        if C.shape != (len(output_columns), n) or D.shape != (len(output_columns), m):
+            raise ValueError("C and D must have one row per output column")
+        if len(input_columns) != m:
+            raise ValueError(
+                "Number of input columns must match number of columns of B"
+            )
+        if max_iterations < 1:
+            raise ValueError("max_iterations must be at least 1")
+        self.system = system
+        self.horizon = horizon
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+
+        # Bounds and band limits repeated for every step of the horizon
+        lower, upper = np.array([input_bounds[col] for col in input_columns], float).T
+        if np.any(lower < 0) or np.any(upper < lower):
+            raise ValueError("Input bounds must be non-negative and ordered")
+        self.lower = np.tile(lower, horizon)
+        self.upper = np.tile(upper, horizon)
+        band_min, band_max = np.array(
+            [target_bands[col] for col in output_columns], float
+        ).T
+        self.band_min = np.tile(band_min, horizon)
+        self.band_max = np.tile(band_max, horizon)
+
+        # Condense the model once: the outputs y_0, ..., y_(H-1) are
+        # Y = Phi x_0 + G U with y_k = C x_k + D u_k
+        cache = system.precompute_rollout(horizon)
+        C_blocks = np.kron(np.eye(horizon), C)
+        self.Phi = C_blocks @ cache["A_powers"][:horizon].reshape(horizon * n, n)
+        shifted_toeplitz = np.zeros((horizon * n, horizon * m))
+        shifted_toeplitz[n:] = cache["toeplitz"][: (horizon - 1) * n, : horizon * m]
+        self.G = C_blocks @ shifted_toeplitz + np.kron(np.eye(horizon), D)
+
+        # The solver works on doses relative to their upper bounds and on band
+        # violations relative to the band widths, so that every input and output
+        # weighs the same regardless of its units
+        self.input_scale = np.where(self.upper > 0, self.upper, 1.0)
+        self.scaled_G = self.G * self.input_scale
+        self.output_weights = band_weight / np.tile(band_max - band_min, horizon) ** 2
+        self.input_weight = input_weight
+
+        self.plan = np.zeros(horizon * m)
+        self.iterations = 0
+
+    def _objective(self, z, free_response):
+        Y = free_response + self.scaled_G @ z
+        violation = np.maximum(Y - self.band_max, 0) - np.maximum(self.band_min - Y, 0)
+        return 0.5 * (
+            np.dot(self.output_weights * violation, violation)
+            + self.input_weight * np.dot(z, z)
+        )
+
+    @instrumented()
+    def solve(self, x=None, warm_start=True):
+        if x is None:
+            x = self.system.x
+        free_response = self.Phi @ np.asarray(x, dtype=float).reshape(-1)
+        m = self.system.B.shape[1]
+        lower = self.lower / self.input_scale
+        upper = self.upper / self.input_scale
+
+        # Shift the previous plan by one step as the starting point
+        if warm_start:
+            z = np.concatenate((self.plan[m:], self.plan[-m:])) / self.input_scale
+        else:
+            z = np.zeros_like(self.plan)
+        z = np.clip(z, lower, upper)
+
+        # Projected Newton method. The objective is quadratic on every set of
+        # violated band limits, so each iteration solves the quadratic of the
+        # current set over the inputs that are not held at a bound.
+        objective = self._objective(z, free_response)
+        for iteration in range(1, self.max_iterations + 1):
+            Y = free_response + self.scaled_G @ z
+            above, below = Y > self.band_max, Y < self.band_min
+            active_weights = self.output_weights * (above | below)
+            violation = np.where(above, Y - self.band_max, 0) + np.where(
+                below, Y - self.band_min, 0
+            )
+            gradient = (
+                self.scaled_G.T @ (active_weights * violation) + self.input_weight * z
+            )
+            free = ~(((z <= lower) & (gradient > 0)) | ((z >= upper) & (gradient < 0)))
+            if np.max(np.abs(gradient[free]), initial=0.0) <= self.tolerance:
+                break
+
+            G_free = self.scaled_G[:, free]
+            hessian = G_free.T @ (active_weights[:, None] * G_free)
+            hessian[np.diag_indices_from(hessian)] += self.input_weight
+            direction = np.zeros_like(z)
+            direction[free] = -np.linalg.solve(hessian, gradient[free])
+
+            # Backtrack along the projected path until the objective decreases
+            step = 1.0
+            while step >= 1e-10:
+                z_next = np.clip(z + step * direction, lower, upper)
+                objective_next = self._objective(z_next, free_response)
+                if objective_next <= objective + 1e-4 * np.dot(gradient, z_next - z):
+                    break
+                step *= 0.5
+            else:
+                break
+            z, objective = z_next, objective_next
+
+        self.iterations = iteration
+        self.plan = z * self.input_scale
+        return self.plan[:m]
+
+    def predict_outputs(self, x=None, U=None):
+        if x is None:
+            x = self.system.x
+        if U is None:
+            U = self.plan
+        Y = self.Phi @ np.asarray(x, dtype=float).reshape(-1) + self.G @ U
+        return Y.reshape(self.horizon, -1)
@@ -0,0 +1,142 @@
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from src.linear_control_system.linear_control_system import LinearControlSystem
+
+MODEL_WEIGHTS_ROOT = "data/state_space_model_weights"
+
+MODEL_SUFFIX = "_simulated"
+
+MATRIX_NAMES = ("A", "B", "C", "D")
+
+RegisteredModel = namedtuple(
+    "RegisteredModel", ["system", "C", "D", "eigenvalues", "eigenvectors"]
+)
+
+
+def parse_model_name(name):
+    # e.g. win23_subset_zip_grow_tower_side_b_simulated -> (subset_zip_..., win23)
+    if name.endswith(MODEL_SUFFIX):
+        name = name[: -len(MODEL_SUFFIX)]
+    season, _, tower = name.partition("_")
+    if not tower:
+        raise ValueError(f"Model name {name} must start with a season prefix")
+    return tower, season
+
+
+def model_name(tower, season):
+    return f"{season}_{tower}{MODEL_SUFFIX}"
+
+
+class ModelRegistry:
+    def __init__(self, root=MODEL_WEIGHTS_ROOT, max_cached_models=256):
+        self.root = root
+        self.max_cached_models = max_cached_models
+        self._index = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _build_index(self):
+        # Models are stored either as a .npz archive or as a directory with one
+        # .npy file per matrix. The directory format can be memory-mapped.
+        index = {}
+        for entry in os.scandir(self.root):
+            name, extension = os.path.splitext(entry.name)
+            if entry.is_file() and extension == ".npz":
+                path = entry.path
+            elif entry.is_dir() and os.path.exists(os.path.join(entry.path, "A.npy")):
+                name, path = entry.name, entry.path
+            else:
+                continue
+            try:
+                key = parse_model_name(name)
+            except ValueError:
+                continue
+            # Prefer the memory-mappable directory when both formats exist
+            if key not in index or os.path.isdir(path):
+                index[key] = path
+        return index
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    def refresh(self):
+        with self._lock:
+            self._index = None
+            self._cache.clear()
+
+    def models(self):
+        return sorted(self.index)
+
+    def _load_matrices(self, path):
+        if os.path.isdir(path):
+            return {
+                name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+                for name in MATRIX_NAMES
+            }
+        # Members of a .npz archive are only decompressed when accessed
+        with np.load(path) as weights:
+            matrices = {name: weights[name] for name in MATRIX_NAMES}
+        # The matrices are shared by every system handed out for the model, like the
+        # memory-mapped ones
+        for matrix in matrices.values():
+            matrix.setflags(write=False)
+        return matrices
+
+    def _load_model(self, tower, season):
+        try:
+            path = self.index[(tower, season)]
+        except KeyError:
+            raise KeyError(f"No model for tower {tower} in season {season}") from None
+        matrices = self._load_matrices(path)
+        A = matrices["A"]
+        system = LinearControlSystem(
+            A, matrices["B"], np.zeros(A.shape[0]), matrices["C"], matrices["D"]
+        )
+        # The system memoizes its eigendecomposition, so later stability queries on
+        # the systems handed out for the model reuse this result
+        eigenvalues, eigenvectors = system.compute_A_eigen()
+        return RegisteredModel(system, system.C, system.D, eigenvalues, eigenvectors)
+
+    def get_model(self, tower, season):
+        # Every call gets its own copy of the cached system, so callers that set the
+        # state, enable the hot path or precompute rollouts do not affect each other.
+        # The read-only matrices and the memoized analysis are shared.
+        key = (tower, season)
+        with self._lock:
+            model = self._cache.get(key)
+            if model is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return model._replace(system=model.system.copy())
+            self.misses += 1
+
+        model = self._load_model(tower, season)
+        with self._lock:
+            self._cache[key] = model
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached_models:
+                self._cache.popitem(last=False)
+        return model._replace(system=model.system.copy())
+
+    def get_system(self, tower, season):
+        return self.get_model(tower, season).system
+
+    def save_model(self, tower, season, A, B, C, D):
+        path = os.path.join(self.root, model_name(tower, season))
+        os.makedirs(path, exist_ok=True)
+        for name, matrix in zip(MATRIX_NAMES, (A, B, C, D)):
+            np.save(os.path.join(path, name + ".npy"), np.ascontiguousarray(matrix))
+        with self._lock:
+            if self._index is not None:
+                self._index[(tower, season)] = path
+            self._cache.pop((tower, season), None)
+        return path
@@ -0,0 +1,172 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.dates import date2num
+from matplotlib.figure import Figure
+
+from src.constants import TARGET_BANDS
+from src.data_pipeline.parquet_storage import PARQUET_ROOT, list_partitions, read_stage
+
+PLOTS_ROOT = "data/daily_system_data_plots"
+
+SEASON_NAMES = {"win": "Winter", "spr": "Spring", "sum": "Summer", "fal": "Fall"}
+
+
+def figure_title(tower, season):
+    # e.g. ("subset_zip_grow_tower_side_b", "win23") -> Winter 23 Subset Zip Grow...
+    name = SEASON_NAMES.get(season[:3], season[:3].title())
+    return f"{name} {season[3:]} {tower.replace('_', ' ').title()}"
+
+
+def target_bands(columns):
+    # Desired ranges of the measured outputs, for simulated columns as well
+    bands = {}
+    for col in columns:
+        output = col[len("sim_") :] if col.startswith("sim_") else col
+        if output in TARGET_BANDS:
+            bands[col] = TARGET_BANDS[output]
+    return bands
+
+
+def decimate_min_max(x, y, num_bins):
+    # Keep the smallest and largest value of every bin, in time order, so that a
+    # series drawn num_bins pixels wide looks the same as the full series. Series
+    # that are already short enough are returned unchanged.
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if num_bins < 1 or n <= 2 * num_bins:
+        return x, y
+
+    # Bins of equal size, with the last one padded by missing values
+    bin_size = -(-n // num_bins)
+    num_bins = -(-n // bin_size)
+    padded = np.full(num_bins * bin_size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(num_bins, bin_size)
+    offsets = np.arange(num_bins) * bin_size
+    index_min = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    index_max = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+    indices = np.sort(np.stack([index_min, index_max], axis=1), axis=1).reshape(-1)
+    indices = np.minimum(indices, n - 1)
+    return x[indices], y[indices]
+
+
+class TowerFigure:
+    def __init__(self, columns, title=None, figsize=(15, 18), dpi=100, bands=None):
+        # One subplot per column sharing the date axis, as in the original plot
+        # scripts. The figure is drawn with Agg directly, without pyplot state.
+        self.columns = list(columns)
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.axes = self.figure.subplots(nrows=len(self.columns), sharex=True)
+        self.axes = np.atleast_1d(self.axes)
+        self.lines = {}
+        bands = target_bands(self.columns) if bands is None else bands
+        for i, (ax, col) in enumerate(zip(self.axes, self.columns)):
+            (self.lines[col],) = ax.plot([], [], color=f"C{i}", label=col)
+            ax.legend()
+            if col in bands:
+                min_val, max_val = bands[col]
+                ax.axhline(y=min_val, color="r", linestyle="--")
+                ax.axhline(y=max_val, color="r", linestyle="--")
+        self.axes[-1].xaxis_date()
+        self.axes[-1].set_xlabel("date")
+        if title is not None:
+            self.set_title(title)
+        self.data = None
+        self._laid_out = False
+
+    def set_title(self, title):
+        self.figure.suptitle(title, y=0.99)
+
+    def _num_bins(self, ax):
+        return int(ax.get_window_extent().width)
+
+    def set_data(self, df):
+        # Replace the data of every line. The figure, axes and artists are reused.
+        self.data = df.reset_index(drop=True)
+        x = date2num(pd.to_datetime(self.data["date"]).to_numpy())
+        for ax, col in zip(self.axes, self.columns):
+            xs, ys = decimate_min_max(x, self.data[col], self._num_bins(ax))
+            self.lines[col].set_data(xs, ys)
+            ax.relim()
+            ax.autoscale_view()
+        if not self._laid_out:
+            # The layout depends on the tick labels, so it is computed once the first
+            # data is drawn and then kept for every update
+            self.figure.tight_layout()
+            self._laid_out = True
+
+    def append(self, df):
+        # New days only update the line data of the existing figure
+        if self.data is None:
+            self.set_data(df)
+        else:
+            self.set_data(pd.concat([self.data, df], ignore_index=True))
+
+    def save(self, path):
+        self.canvas.print_png(path)
+
+
+# Figures of each worker process by plotted columns. Towers rendered by the same
+# worker reuse the figure and its layout and only replace the line data and title.
+_figures = {}
+
+
+def _render_tower(task):
+    stage, columns, tower, season, output_path, first_row, title_suffix, root = task
+    df = read_stage(
+        stage, columns=["date"] + columns, tower=tower, season=season, root=root
+    ).iloc[first_row:]
+    figure = _figures.get(tuple(columns))
+    if figure is None:
+        figure = _figures[tuple(columns)] = TowerFigure(columns)
+    figure.set_title(figure_title(tower, season) + title_suffix)
+    figure.set_data(df)
+    figure.save(output_path)
+    return output_path
+
+
+def render_fleet(
+    stage,
+    columns,
+    suffix,
+    towers=None,
+    output_dir=PLOTS_ROOT,
+    first_row=0,
+    title_suffix="",
+    root=PARQUET_ROOT,
+    max_workers=None,
+):
+    # One PNG per tower and season, e.g. win23_<tower>_simulated.png, rendered in
+    # parallel worker processes that each read only their own partition
+    if towers is None:
+        towers = list_partitions(stage, root=root)
+    tasks = [
+        (
+            stage,
+            list(columns),
+            tower,
+            season,
+            os.path.join(output_dir, f"{season}_{tower}_{suffix}.png"),
+            first_row,
+            title_suffix,
+            root,
+        )
+        for tower, season in towers
+    ]
+    if max_workers is None:
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+    if max_workers <= 1 or len(tasks) <= 1:
+        return [_render_tower(task) for task in tasks]
+    # Several towers per task, so each worker reuses its figure
+    chunksize = max(1, len(tasks) // (4 * max_workers))
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return list(executor.map(_render_tower, tasks, chunksize=chunksize))
@@ -0,0 +1,221 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS, TARGET_BANDS
+from src.instrumentation.instrumentation import instrumented
+from src.linear_control_system.batched_linear_control_system import (
+    BatchedLinearControlSystem,
+)
+from src.model_registry.model_registry import ModelRegistry
+
+# Largest size of the arrays simulated for one chunk of policies
+MAX_CHUNK_BYTES = 64 * 2**20
+
+
+def policy_grid(amounts, every=None, input_columns=INPUT_COLUMNS):
+    # Every combination of daily dose amounts and dosing intervals in days, e.g.
+    # policy_grid({"pH_down_mL": [0, 2, 4]}, {"pH_down_mL": [1, 7]}) has 6 policies.
+    # Actuators that are not listed are not used. Returns the (policies x actuators)
+    # amounts and intervals.
+    every = {} if every is None else every
+    unknown = (set(amounts) | set(every)) - set(input_columns)
+    if unknown:
+        raise ValueError(f"Unknown actuators {sorted(unknown)}")
+    grid = np.array(
+        list(
+            itertools.product(
+                *[amounts.get(col, [0.0]) for col in input_columns],
+                *[every.get(col, [1]) for col in input_columns],
+            )
+        ),
+        dtype=float,
+    )
+    m = len(input_columns)
+    return grid[:, :m], grid[:, m:].astype(int)
+
+
+def dosing_schedule(amounts, every, num_steps):
+    # Inputs of every policy over the horizon, (policies x time x actuators). Each
+    # actuator doses its amount on the first day and then every so many days.
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+    every = np.broadcast_to(np.atleast_2d(np.asarray(every, dtype=int)), amounts.shape)
+    if (every < 1).any():
+        raise ValueError("Dosing intervals must be at least one day")
+    days = np.arange(num_steps)[None, :, None]
+    return np.where(days % every[:, None, :] == 0, amounts[:, None, :], 0.0)
+
+
+class ScenarioSweep:
+    def __init__(
+        self,
+        A,
+        B,
+        C,
+        D,
+        x,
+        towers=None,
+        initial_outputs=None,
+        input_columns=INPUT_COLUMNS,
+        output_columns=OUTPUT_COLUMNS,
+        target_bands=TARGET_BANDS,
+    ):
+        # Models of all towers stacked along the first axis. A is (N, n, n), B is
+        # (N, n, m), C is (N, p, n), D is (N, p, m) and x is (N, n). Initial outputs,
+        # one row per tower or shared by all towers, replace x as the starting point.
+        self.A = np.asarray(A, dtype=float)
+        self.B = np.asarray(B, dtype=float)
+        self.C = np.asarray(C, dtype=float)
+        self.D = np.asarray(D, dtype=float)
+        self.x = np.asarray(x, dtype=float)
+        N, n, m = self.B.shape
+        p = self.C.shape[1]
+        if (
+            self.A.shape != (N, n, n)
+            or self.C.shape != (N, p, n)
+            or self.D.shape != (N, p, m)
+            or self.x.shape != (N, n)
+        ):
+            raise ValueError(
+                "A, B, C, D and x must describe the same number of towers with "
+                "matching dimensions"
+            )
+        if m != len(input_columns) or p != len(output_columns):
+            raise ValueError("Columns of B and rows of C must match the column names")
+        self.initial_outputs = None
+        if initial_outputs is not None:
+            self.initial_outputs = np.broadcast_to(
+                np.asarray(initial_outputs, dtype=float), (N, p)
+            )
+            self.C_pinv = np.linalg.pinv(self.C)
+        self.towers = list(range(N)) if towers is None else list(towers)
+        if len(self.towers) != N:
+            raise ValueError("There must be one tower name per model")
+        self.input_columns = list(input_columns)
+        self.output_columns = list(output_columns)
+        self.band_min, self.band_max = np.array(
+            [target_bands[col] for col in output_columns], float
+        ).T
+
+    @classmethod
+    def from_systems(cls, systems, towers=None, initial_outputs=None, **kwargs):
+        # Stack LinearControlSystem objects with C and D. Models of lower order are
+        # padded with states that are never excited, so towers identified with
+        # different ranks are simulated together. Without initial outputs the
+        # towers start from their current states.
+        systems = list(systems)
+        order = max(system.A.shape[0] for system in systems)
+        m = systems[0].B.shape[1]
+        p = systems[0].C.shape[0]
+        A = np.zeros((len(systems), order, order))
+        B = np.zeros((len(systems), order, m))
+        C = np.zeros((len(systems), p, order))
+        D = np.zeros((len(systems), p, m))
+        x = np.zeros((len(systems), order))
+        for i, system in enumerate(systems):
+            n = system.A.shape[0]
+            A[i, :n, :n] = system.A
+            B[i, :n] = system.B
+            C[i, :, :n] = system.C
+            if system.D is not None:
+                D[i] = system.D
+            x[i, :n] = np.asarray(system.x, dtype=float).reshape(-1)
+        return cls(
+            A, B, C, D, x, towers=towers, initial_outputs=initial_outputs, **kwargs
+        )
+
+    @classmethod
+    def from_registry(cls, registry=None, keys=None, initial_outputs=None, **kwargs):
+        # All registered (tower, season) models by default, named like their files
+        registry = ModelRegistry() if registry is None else registry
+        keys = registry.models() if keys is None else list(keys)
+        return cls.from_systems(
+            [registry.get_system(tower, season) for tower, season in keys],
+            towers=[f"{season}_{tower}" for tower, season in keys],
+            initial_outputs=initial_outputs,
+            **kwargs,
+        )
+
+    @property
+    def num_towers(self):
+        return self.A.shape[0]
+
+    def bytes_per_policy(self, num_steps):
+        # Inputs, input contributions, states, output terms and in-band flags of
+        # one policy
+        N, n, m = self.B.shape
+        p = self.C.shape[1]
+        return num_steps * (8 * m + N * (8 * (2 * n + 3 * p) + p))
+
+    def initial_states(self, u0):
+        # Initial states of every tower with one column per policy, (towers x states
+        # x policies) for day-0 doses u0 of shape (actuators x policies). With initial
+        # outputs, x_0 = C^+ (y_0 - D u_0), so every policy starts at those outputs.
+        if self.initial_outputs is None:
+            return np.repeat(self.x[:, :, None], u0.shape[1], axis=2)
+        y0 = self.initial_outputs[:, :, None] - np.matmul(self.D, u0)
+        return np.matmul(self.C_pinv, y0)
+
+    def simulate(self, amounts, every, num_steps):
+        # Outputs of every policy on every tower, (policies x towers x time x outputs)
+        return self._simulate(amounts, every, num_steps).transpose(3, 1, 0, 2)
+
+    def _simulate(self, amounts, every, num_steps):
+        # Policies are the trajectories of a BatchedLinearControlSystem of the towers,
+        # so every step is one (n x n) by (n x policies) product per tower rather
+        # than a product per tower and policy
+        U = dosing_schedule(amounts, every, num_steps).transpose(1, 2, 0)[:, None]
+        N, n, m = self.B.shape
+        if num_steps == 0:
+            return np.empty((0, N, self.C.shape[1], U.shape[-1]))
+
+        system = BatchedLinearControlSystem(
+            self.A, self.B, self.initial_states(U[0, 0])
+        )
+        U = np.broadcast_to(U, (num_steps, N, m, U.shape[-1]))
+        X = system.simulate(U)[:-1]
+        return np.matmul(self.C, X) + np.matmul(self.D, U)
+
+    @instrumented()
+    def time_in_band(self, amounts, every, num_steps, max_chunk_bytes=MAX_CHUNK_BYTES):
+        # Fraction of days each output is within its target band, (policies x towers
+        # x outputs), and the fraction of days all outputs are, (policies x towers).
+        # Policies are simulated in chunks so memory stays below max_chunk_bytes.
+        amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+        every = np.broadcast_to(np.atleast_2d(np.asarray(every, int)), amounts.shape)
+        num_policies = amounts.shape[0]
+        p = self.C.shape[1]
+        chunk_size = max(1, max_chunk_bytes // max(1, self.bytes_per_policy(num_steps)))
+
+        per_output = np.empty((num_policies, self.num_towers, p))
+        all_outputs = np.empty((num_policies, self.num_towers))
+        for start in range(0, num_policies, chunk_size):
+            chunk = slice(start, start + chunk_size)
+            Y = self._simulate(amounts[chunk], every[chunk], num_steps)
+            in_band = (Y >= self.band_min[:, None]) & (Y <= self.band_max[:, None])
+            per_output[chunk] = in_band.mean(axis=0).transpose(2, 0, 1)
+            all_outputs[chunk] = in_band.all(axis=2).mean(axis=0).T
+        return per_output, all_outputs
+
+    def sweep(self, amounts, every, num_steps, max_chunk_bytes=MAX_CHUNK_BYTES):
+        # One row per policy and tower with the policy and its time in band
+        amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+        every = np.broadcast_to(np.atleast_2d(np.asarray(every, int)), amounts.shape)
+        per_output, all_outputs = self.time_in_band(
+            amounts, every, num_steps, max_chunk_bytes
+        )
+        num_policies = amounts.shape[0]
+        df = pd.DataFrame(
+            {
+                "policy": np.repeat(np.arange(num_policies), self.num_towers),
+                "tower": np.tile(np.array(self.towers, dtype=object), num_policies),
+            }
+        )
+        for j, col in enumerate(self.input_columns):
+            df[col] = np.repeat(amounts[:, j], self.num_towers)
+            df["every_" + col] = np.repeat(every[:, j], self.num_towers)
+        for j, col in enumerate(self.output_columns):
+            df["time_in_band_" + col] = per_output[:, :, j].reshape(-1)
+        df["time_in_band"] = all_outputs.reshape(-1)
+        return df
@@ -0,0 +1,166 @@
+import copy
+
+import numpy as np
+from scipy.linalg import solve_discrete_are
+
+from src.instrumentation.instrumentation import instrumented, length_of
+
+
+class KalmanFilter:
+    def __init__(self, system, Q, R, S=None, C=None, D=None):
+        C = system.C if C is None else C
+        D = system.D if D is None else D
+        if C is None:
+            raise ValueError("Matrix C must be defined on the system or given.")
+        n, m = system.B.shape
+        p = C.shape[0]
+        if D is None:
+            D = np.zeros((p, m))
+        if S is None:
+            S = np.zeros((n, p))
+        if Q.shape != (n, n) or R.shape != (p, p) or S.shape != (n, p):
+            raise ValueError("Noise covariances must match the state and output sizes")
+        self.A = system.A
+        self.B = system.B
+        self.C = C
+        self.D = D
+        self.Q = Q
+        self.R = R
+        self.S = S
+
+        # Steady-state prediction covariance from the DARE, solved once. For
+        # x_(k+1) = A x_k + B u_k + w_k and y_k = C x_k + D u_k + v_k, with
+        # cov(w) = Q, cov(v) = R and cov(w, v) = S.
+        self.P = solve_discrete_are(self.A.T, self.C.T, Q, R, s=S)
+        self._gains = {}
+        self.gain(np.ones(p, dtype=bool))
+
+        # Predicted state x_(k|k-1) of the next reading
+        self.x = np.asarray(system.x, dtype=float).reshape(-1).copy()
+
+    @classmethod
+    def from_noise_covariance(cls, system, noise_covariance, C=None, D=None):
+        # Covariance of [v; w] as returned by nfoursid system identification
+        p = (system.C if C is None else C).shape[0]
+        R = noise_covariance[:p, :p]
+        S = noise_covariance[p:, :p]
+        Q = noise_covariance[p:, p:]
+        return cls(system, Q, R, S, C, D)
+
+    def copy(self, x=None):
+        # Filter of another tower with the same model, started from x. The DARE
+        # solution and the cache of gains are shared rather than computed again.
+        other = copy.copy(self)
+        other.x = np.array(self.x if x is None else x, dtype=float).reshape(-1)
+        return other
+
+    def gain(self, observed):
+        # Steady-state gains restricted to the observed outputs, cached per pattern
+        # of missing readings. Returns the filter gain L, used for x_(k|k), and the
+        # predictor gain K, used for x_(k+1|k).
+        key = tuple(observed)
+        if key not in self._gains:
+            C = self.C[observed]
+            innovation_covariance = (
+                C @ self.P @ C.T + self.R[np.ix_(observed, observed)]
+            )
+            L = np.linalg.solve(innovation_covariance, C @ self.P).T
+            K = np.linalg.solve(
+                innovation_covariance, (self.A @ self.P @ C.T + self.S[:, observed]).T
+            ).T
+            self._gains[key] = (L, K)
+        return self._gains[key]
+
+    def update(self, u, y):
+        u = np.asarray(u, dtype=float).reshape(-1)
+        y = np.asarray(y, dtype=float).reshape(-1)
+
+        # Missing readings are left out of the correction instead of interpolated
+        observed = ~np.isnan(y)
+        prediction = self.A @ self.x + self.B @ u
+        if not observed.any():
+            filtered = self.x
+            self.x = prediction
+            return filtered
+
+        L, K = self.gain(observed)
+        innovation = y[observed] - self.C[observed] @ self.x - self.D[observed] @ u
+        filtered = self.x + L @ innovation
+        self.x = prediction + K @ innovation
+        return filtered
+
+    @instrumented(steps=length_of(1, "U"))
+    def filter(self, U, Y):
+        U = np.asarray(U, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        filtered = np.empty((U.shape[0], self.A.shape[0]))
+        for k, (u, y) in enumerate(zip(U, Y)):
+            filtered[k] = self.update(u, y)
+        return filtered
+
+
+class BatchedKalmanFilter:
+    def __init__(self, filters):
+        # Steady-state filters of many towers with the same dimensions, updated
+        # together with stacked gains
+        self.filters = list(filters)
+        self.A = np.stack([f.A for f in self.filters])
+        self.B = np.stack([f.B for f in self.filters])
+        self.C = np.stack([f.C for f in self.filters])
+        self.D = np.stack([f.D for f in self.filters])
+        p = self.C.shape[1]
+        gains = [f.gain(np.ones(p, dtype=bool)) for f in self.filters]
+        self.L = np.stack([L for L, _ in gains])
+        self.K = np.stack([K for _, K in gains])
+        self.x = np.stack([f.x for f in self.filters])
+
+    @property
+    def num_systems(self):
+        return len(self.filters)
+
+    def add(self, filters):
+        # Append towers, e.g. when new towers connect to the ingestion service.
+        # Returns the indices of the added towers.
+        added = BatchedKalmanFilter(filters)
+        start = self.num_systems
+        self.filters += added.filters
+        for name in ("A", "B", "C", "D", "L", "K", "x"):
+            setattr(
+                self, name, np.concatenate((getattr(self, name), getattr(added, name)))
+            )
+        return np.arange(start, self.num_systems)
+
+    def update_one(self, i, u, y):
+        # Update a single tower with its own filter, e.g. for a reading with missing
+        # outputs, keeping the stacked state in sync
+        self.filters[i].x = self.x[i]
+        filtered = self.filters[i].update(u, y)
+        self.x[i] = self.filters[i].x
+        return filtered
+
+    def update(self, U, Y, indices=None):
+        # One row of U and Y per tower, or per tower in indices when only some of
+        # the towers have a new reading
+        U = np.asarray(U, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        indices = np.arange(self.num_systems) if indices is None else indices
+        indices = np.asarray(indices)
+        A, B, C, D = self.A[indices], self.B[indices], self.C[indices], self.D[indices]
+        x = self.x[indices]
+        prediction = np.einsum("nij,nj->ni", A, x) + np.einsum("nij,nj->ni", B, U)
+        innovation = Y - np.einsum("nij,nj->ni", C, x) - np.einsum("nij,nj->ni", D, U)
+        complete = ~np.isnan(Y).any(axis=1)
+        filtered = x.copy()
+        filtered[complete] += np.einsum(
+            "nij,nj->ni", self.L[indices[complete]], innovation[complete]
+        )
+        next_x = prediction
+        next_x[complete] += np.einsum(
+            "nij,nj->ni", self.K[indices[complete]], innovation[complete]
+        )
+        self.x[indices[complete]] = next_x[complete]
+
+        # Towers with missing readings use the gains of their observed outputs
+        for k in np.flatnonzero(~complete):
+            filtered[k] = self.update_one(indices[k], U[k], Y[k])
+        return filtered
@@ -0,0 +1,158 @@
+import contextlib
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+from src.data_pipeline.parquet_storage import PARQUET_ROOT, list_partitions, read_stage
+from src.instrumentation.instrumentation import instrumented, length_of
+from src.linear_control_system.simulation import simulate_dataframe
+
+# Environment variables read by the common BLAS/OpenMP runtimes when they start
+BLAS_THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+@instrumented(rows=length_of(0, "df"))
+def identify_system(
+    df,
+    num_block_rows=1,
+    rank=3,
+    input_columns=INPUT_COLUMNS,
+    output_columns=OUTPUT_COLUMNS,
+):
+    # Identify both subspace and system equations using N4SID.
+    # Github Repository: https://github.com/spmvg/nfoursid
+    # Original Paper:
+    # Van Overschee, P., & De Moor, B. (1994). N4SID:
+    # Subspace algorithms for the identification of combined deterministic-stochastic systems.
+    # Automatica, 30(1), 75-93. https://doi.org/10.1016/0005-1098(94)90230-5
+    # nfoursid imports matplotlib.pyplot, so it is only imported when identifying
+    from nfoursid.nfoursid import NFourSID
+
+    nfoursid = NFourSID(
+        df,
+        input_columns=input_columns,
+        output_columns=output_columns,
+        num_block_rows=num_block_rows,
+    )
+    nfoursid.subspace_identification()
+    state_space_identified, covariance_matrix = nfoursid.system_identification(
+        rank=rank
+    )
+    result = {
+        "A": state_space_identified.a,
+        "B": state_space_identified.b,
+        "C": state_space_identified.c,
+        "D": state_space_identified.d,
+        "covariance": covariance_matrix,
+    }
+
+    # Simulate the identified model over the data as in system_realization.py
+    simulated_df = simulate_dataframe(
+        state_space_identified, df, input_columns, output_columns
+    )
+    for col in output_columns:
+        measured = df[col].to_numpy(dtype=float)
+        error = measured - simulated_df["sim_" + col].to_numpy()
+        result["rmse_" + col] = np.sqrt(np.mean(error**2))
+        # Normalized fit in percent, 100 is a perfect simulation
+        result["fit_" + col] = 100 * (
+            1 - np.linalg.norm(error) / np.linalg.norm(measured - measured.mean())
+        )
+    return result
+
+
+def _identify_tower(task):
+    tower, season, num_block_rows, rank, root, input_columns, output_columns = task
+    result = {
+        "tower": tower,
+        "season": season,
+        "num_block_rows": num_block_rows,
+        "rank": rank,
+        "error": None,
+    }
+    try:
+        df = read_stage(
+            "interpolated",
+            columns=input_columns + output_columns,
+            tower=tower,
+            season=season,
+            root=root,
+        )
+        result.update(
+            identify_system(df, num_block_rows, rank, input_columns, output_columns)
+        )
+    except Exception as e:
+        # Invalid grid points, e.g. a rank above num_block_rows times the number of
+        # outputs, are reported instead of stopping the whole fleet
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _initialize_worker(num_threads):
+    # Limit the thread pools that were already started when the worker imported
+    # numpy, if threadpoolctl is available
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(num_threads)
+
+
+@contextlib.contextmanager
+def limit_blas_threads(num_threads=1):
+    previous = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+    os.environ.update({name: str(num_threads) for name in BLAS_THREAD_VARIABLES})
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def list_towers(root=PARQUET_ROOT):
+    return list_partitions("interpolated", root=root)
+
+
+def identify_fleet(
+    towers=None,
+    num_block_rows_grid=(1,),
+    rank_grid=(3,),
+    root=PARQUET_ROOT,
+    max_workers=None,
+    threads_per_worker=1,
+    input_columns=INPUT_COLUMNS,
+    output_columns=OUTPUT_COLUMNS,
+):
+    if towers is None:
+        towers = list_towers(root)
+    tasks = [
+        (tower, season, num_block_rows, rank, root, input_columns, output_columns)
+        for (tower, season), num_block_rows, rank in itertools.product(
+            towers, num_block_rows_grid, rank_grid
+        )
+    ]
+
+    # Workers are spawned rather than forked, so each one starts its BLAS runtime
+    # with the thread limit instead of max_workers times all cores
+    with limit_blas_threads(threads_per_worker), ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_initialize_worker,
+        initargs=(threads_per_worker,),
+    ) as executor:
+        results = list(executor.map(_identify_tower, tasks))
+    return pd.DataFrame(results)
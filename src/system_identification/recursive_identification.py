@@ -0,0 +1,108 @@
+import numpy as np
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+
+
+class RecursiveSystemIdentification:
+    def __init__(
+        self,
+        A,
+        B,
+        C,
+        D,
+        forgetting_factor=0.99,
+        initial_covariance=1e3,
+        noise_covariance=None,
+    ):
+        if not 0 < forgetting_factor <= 1:
+            raise ValueError("Forgetting factor must be in (0, 1]")
+        n, m = B.shape
+        if np.linalg.matrix_rank(C) < n:
+            raise ValueError(
+                "C must have full column rank to reconstruct the state from outputs"
+            )
+
+        # C and D fix the state basis, so only A and B are re-estimated. The state
+        # of every row is reconstructed from its measurement, x_k = C^+ (y_k - D u_k),
+        # and [A B] is fit to x_(k+1) = A x_k + B u_k by recursive least squares.
+        self.C = C
+        self.D = D
+        self.C_pinv = np.linalg.pinv(C)
+        self.forgetting_factor = forgetting_factor
+        self.theta = np.vstack((A.T, B.T)).astype(float)
+        self.covariance = initial_covariance * np.eye(n + m)
+        self.previous_regressor = None
+        # Noise covariance of the identified model, kept for the Kalman filter and
+        # Monte Carlo simulation that read it from the saved weights
+        self.noise_covariance = noise_covariance
+
+    @classmethod
+    def from_npz(cls, path, **kwargs):
+        with np.load(path) as weights:
+            if "covariance" in weights:
+                kwargs.setdefault("noise_covariance", weights["covariance"])
+            identification = cls(
+                weights["A"], weights["B"], weights["C"], weights["D"], **kwargs
+            )
+            if "rls_covariance" in weights:
+                identification.covariance = weights["rls_covariance"]
+        return identification
+
+    # Copies, since theta is updated in place by every row
+    @property
+    def A(self):
+        return self.theta[: self.C.shape[1]].T.copy()
+
+    @property
+    def B(self):
+        return self.theta[self.C.shape[1] :].T.copy()
+
+    def estimate_state(self, u, y):
+        return self.C_pinv @ (y - self.D @ u)
+
+    def update(self, u, y):
+        u = np.asarray(u, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if np.isnan(u).any() or np.isnan(y).any():
+            # A missing reading would make theta NaN for good. The row is skipped,
+            # and so is the next one, which has no regressor to pair with.
+            self.previous_regressor = None
+            return self.A, self.B
+        x = self.estimate_state(u, y)
+
+        if self.previous_regressor is not None:
+            # One RLS step with exponential forgetting, O((n + m)^2) per row
+            phi = self.previous_regressor
+            P_phi = self.covariance @ phi
+            gain = P_phi / (self.forgetting_factor + phi @ P_phi)
+            prediction_error = x - phi @ self.theta
+            self.theta += np.outer(gain, prediction_error)
+            self.covariance = (
+                self.covariance - np.outer(gain, P_phi)
+            ) / self.forgetting_factor
+            # Keep the covariance symmetric against round-off
+            self.covariance = 0.5 * (self.covariance + self.covariance.T)
+
+        self.previous_regressor = np.concatenate((x, u))
+        return self.A, self.B
+
+    def update_dataframe(
+        self, df, input_columns=INPUT_COLUMNS, output_columns=OUTPUT_COLUMNS
+    ):
+        inputs = df[input_columns].to_numpy(dtype=float)
+        outputs = df[output_columns].to_numpy(dtype=float)
+        for u, y in zip(inputs, outputs):
+            self.update(u, y)
+        return self.A, self.B
+
+    def save(self, path):
+        weights = {
+            "A": self.A,
+            "B": self.B,
+            "C": self.C,
+            "D": self.D,
+            "rls_covariance": self.covariance,
+        }
+        if self.noise_covariance is not None:
+            weights["covariance"] = self.noise_covariance
+        np.savez(path, **weights)
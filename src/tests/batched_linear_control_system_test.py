@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from src.linear_control_system.batched_linear_control_system import (
+    BatchedLinearControlSystem,
+)
+from src.linear_control_system.linear_control_system import LinearControlSystem
+
+
+def make_systems(num_systems=4, n=3, m=5, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        LinearControlSystem(
+            0.5 * rng.standard_normal((n, n)),
+            rng.standard_normal((n, m)),
+            rng.standard_normal(n),
+        )
+        for _ in range(num_systems)
+    ]
+
+
+# Test cases for initialization
+def test_initialization_with_invalid_dimensions():
+    A = np.zeros((2, 3, 3))
+    B = np.zeros((2, 2, 1))
+    x = np.zeros((2, 3))
+    with pytest.raises(ValueError):
+        BatchedLinearControlSystem(A, B, x)
+
+
+def test_from_systems():
+    systems = make_systems()
+    batch = BatchedLinearControlSystem.from_systems(systems)
+    assert batch.num_systems == len(systems)
+    assert np.array_equal(batch.A[1], systems[1].A)
+    assert np.array_equal(batch.x[2], systems[2].x)
+
+
+# Test cases for calculate_next_state
+def test_calculate_next_state_matches_individual_systems():
+    systems = make_systems()
+    batch = BatchedLinearControlSystem.from_systems(systems)
+    u = np.random.default_rng(1).standard_normal((len(systems), 5))
+    next_x = batch.calculate_next_state(u)
+    for i, system in enumerate(systems):
+        assert np.allclose(next_x[i], system.calculate_next_state(u[i]))
+
+
+def test_calculate_next_state_with_invalid_dimensions():
+    batch = BatchedLinearControlSystem.from_systems(make_systems())
+    with pytest.raises(ValueError):
+        batch.calculate_next_state(np.zeros((4, 4)))
+
+
+# Test cases for simulate
+def test_simulate_matches_individual_systems():
+    systems = make_systems()
+    batch = BatchedLinearControlSystem.from_systems(systems)
+    U = np.random.default_rng(2).standard_normal((10, len(systems), 5))
+    trajectory = batch.simulate(U)
+    assert trajectory.shape == (11, len(systems), 3)
+    for i, system in enumerate(systems):
+        assert np.allclose(trajectory[0, i], system.x)
+        for t in range(U.shape[0]):
+            assert np.allclose(
+                trajectory[t + 1, i], system.calculate_next_state(U[t, i])
+            )
+    assert np.allclose(batch.x, trajectory[-1])
+
+
+def test_simulate_trajectories_as_columns():
+    systems = make_systems()
+    rng = np.random.default_rng(3)
+    x = rng.standard_normal((len(systems), 3, 2))
+    batch = BatchedLinearControlSystem(
+        np.stack([system.A for system in systems]),
+        np.stack([system.B for system in systems]),
+        x,
+    )
+    U = rng.standard_normal((10, len(systems), 5, 2))
+    trajectory = batch.simulate(U)
+    assert trajectory.shape == (11, len(systems), 3, 2)
+    for k in range(2):
+        single = BatchedLinearControlSystem(batch.A, batch.B, x[..., k])
+        assert np.allclose(trajectory[..., k], single.simulate(U[..., k]))
+    with pytest.raises(ValueError):
+        batch.simulate(U[..., 0])
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from src.constants import INPUT_COLUMNS
+from src.data_pipeline.cleaning import (
+    clean_daily_system_data,
+    parse_amounts,
+    parse_ec_adjustments,
+    parse_ph_adjustments,
+)
+
+
+def make_raw_logs():
+    return pd.DataFrame(
+        {
+            "Date": ["1/26", "1/27", "2/27", "3/9", "4/5", "4/25"],
+            "Initial EC": ["1938", "unmeasured ", "2100", "unknown", "2200", "2300"],
+            "Initial pH": [6.5, 6.25, 6.2, 6.1, 6.0, 6.3],
+            "Initial Nutrient Solution Volume": [6, 5.5, 5, 5, 5.5, 6],
+            "Final EC": [1938, None, None, None, None, None],
+            "Final pH": [6.5, None, None, None, None, None],
+            "Final Nutrient Solution Volume": [None, 6, None, None, None, None],
+            "Comments": [None, None, None, None, None, None],
+            "Type of pH Adjustment": ["pH Down", None, "pH Down", None, None, "pH Up"],
+            "Amount of pH Adjustment Used": ["2mL", None, "6ml", None, None, "1 mL"],
+            "Type of EC Adjustment": [
+                None,
+                "Mature, No Water",
+                "1/2 Immature, 1/2 Mature",
+                "3/4 Mature, 1/4 Water",
+                "1/2 immature, 1/2 water",
+                None,
+            ],
+            "Amount of EC Adjustment Used": [
+                None,
+                "1/2 gal",
+                "2 gal",
+                "1gal",
+                None,
+                "ADD WATER",
+            ],
+        }
+    )
+
+
+def test_parse_amounts():
+    amounts = pd.Series(["2mL", "4 mL", "1/2 gal", "1.5 gal", "ADD WATER", None])
+    expected = np.array([2.0, 4.0, 0.5, 1.5, np.nan, np.nan])
+    assert np.allclose(parse_amounts(amounts), expected, equal_nan=True)
+
+
+def test_parse_ph_adjustments():
+    types = pd.Series(["pH Down", "pH Up", None, "pH Down"])
+    amounts = pd.Series(["2mL", "3.5 mL", None, None])
+    adjustments = parse_ph_adjustments(types, amounts)
+    assert np.allclose(adjustments["pH_down_mL"], [2, 0, 0, 0])
+    assert np.allclose(adjustments["pH_up_mL"], [0, 3.5, 0, 0])
+
+
+def test_parse_ec_adjustments():
+    types = pd.Series(
+        ["Immature, No Water", "Water", "3/4 Mature, 1/4 Water", None, "Water"]
+    )
+    amounts = pd.Series(["1 gal", "1.5 gal", "2 gal", "1 gal", None])
+    adjustments = parse_ec_adjustments(types, amounts)
+    assert np.allclose(adjustments["nutrient_mature_gallons"], [0, 0, 1.5, 0, 0])
+    assert np.allclose(adjustments["nutrient_immature_gallons"], [1, 0, 0, 0, 0])
+    assert np.allclose(adjustments["water_gallons"], [0, 1.5, 0.5, 0, 0])
+
+
+def test_clean_daily_system_data():
+    cleaned = clean_daily_system_data(make_raw_logs(), year=2023)
+    assert (
+        list(cleaned.columns)
+        == [
+            "date",
+            "initial_ec",
+            "initial_ph",
+            "initial_nutrient_solution_volume",
+            "final_ec",
+            "final_ph",
+            "final_nutrient_solution_volume",
+        ]
+        + INPUT_COLUMNS
+    )
+    assert cleaned["date"].tolist()[:2] == ["1/26/2023", "1/27/2023"]
+    assert np.allclose(
+        cleaned["initial_ec"], [1938, np.nan, 2100, np.nan, 2200, 2300], equal_nan=True
+    )
+    assert (cleaned[INPUT_COLUMNS].dtypes == float).all()
+    expected_inputs = np.array(
+        [
+            [2, 0, 0, 0, 0],
+            [0, 0, 0.5, 0, 0],
+            [6, 0, 1, 1, 0],
+            [0, 0, 0.75, 0, 0.25],
+            [0, 0, 0, 0, 0],
+            [0, 1, 0, 0, 0],
+        ]
+    )
+    assert np.allclose(cleaned[INPUT_COLUMNS], expected_inputs)
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.cli import build_parser, main, season_year
+from src.data_pipeline.parquet_storage import read_stage
+from src.data_pipeline.synthetic_data import generate_daily_system_log
+
+
+def test_season_year():
+    assert season_year("win23") == 2023
+    with pytest.raises(ValueError):
+        season_year("winter")
+
+
+def test_parser_defaults():
+    args = build_parser().parse_args(["simulate", "--season", "spr24"])
+    assert args.tower == "subset_zip_grow_tower_side_b"
+    assert args.season == "spr24"
+    assert args.csv
+    assert not build_parser().parse_args(["clean", "--no-csv"]).csv
+
+
+def test_import_is_lightweight():
+    # The heavy dependencies are only imported by the commands
+    code = (
+        "import sys, src.cli; "
+        "print(sorted({'pandas', 'pyarrow', 'matplotlib', 'nfoursid', 'scipy'}"
+        " & set(sys.modules)))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert output.stdout.strip() == "[]"
+
+
+def test_pipeline(tmp_path):
+    tower, season = "side_a", "spr23"
+    generate_daily_system_log(num_days=200, start="2023-03-01", seed=0).to_csv(
+        tmp_path / f"{season}_{tower}_manual_mod.csv", index=False
+    )
+    options = [
+        "--tower",
+        tower,
+        "--season",
+        season,
+        "--data-dir",
+        str(tmp_path),
+        "--weights-dir",
+        str(tmp_path),
+    ]
+    for command in (["clean"], ["interpolate"], ["identify"], ["simulate", "--no-csv"]):
+        main(command + options)
+    main(
+        ["plot", "simulated", "--plots-dir", str(tmp_path), "--workers", "1"] + options
+    )
+
+    root = os.path.join(tmp_path, "parquet")
+    simulated = read_stage("simulated", tower=tower, season=season, root=root)
+    assert len(simulated) == len(read_stage("interpolated", root=root))
+    assert np.isfinite(simulated["sim_initial_ec"]).all()
+    assert (tmp_path / f"{season}_{tower}_cleaned_interpolated.csv").exists()
+    assert not (tmp_path / f"{season}_{tower}_simulated.csv").exists()
+    assert (tmp_path / f"{season}_{tower}_simulated.npz").exists()
+    assert (tmp_path / f"{season}_{tower}_simulated.png").exists()
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+from src.data_pipeline.parquet_storage import write_stage
+from src.system_identification.fleet_identification import (
+    identify_fleet,
+    identify_system,
+)
+
+
+def make_tower_data(seed, num_rows=200):
+    # Outputs of a stable third order system driven by random dosing
+    rng = np.random.default_rng(seed)
+    A = np.diag([0.9, 0.7, 0.5])
+    B = 0.5 * rng.standard_normal((3, 5))
+    C = np.eye(3) + 0.1 * rng.standard_normal((3, 3))
+    U = rng.random((num_rows, 5))
+    x = np.zeros(3)
+    Y = np.empty((num_rows, 3))
+    for k, u in enumerate(U):
+        Y[k] = C @ x
+        x = A @ x + B @ u
+    df = pd.DataFrame(U, columns=INPUT_COLUMNS)
+    df[OUTPUT_COLUMNS] = Y + 1e-3 * rng.standard_normal(Y.shape)
+    df.insert(0, "date", pd.date_range("2023-01-01", periods=num_rows))
+    return df
+
+
+def test_identify_system():
+    result = identify_system(make_tower_data(0), num_block_rows=2, rank=3)
+    assert result["A"].shape == (3, 3)
+    assert result["D"].shape == (3, 5)
+    assert np.allclose(
+        np.sort(np.abs(np.linalg.eigvals(result["A"]))), [0.5, 0.7, 0.9], atol=0.05
+    )
+    assert all(result["fit_" + col] > 90 for col in OUTPUT_COLUMNS)
+
+
+def test_identify_fleet(tmp_path):
+    for seed, tower in enumerate(["side_a", "side_b"]):
+        write_stage(
+            make_tower_data(seed), "interpolated", tower, "win23", root=tmp_path
+        )
+    results = identify_fleet(
+        num_block_rows_grid=(1, 2), rank_grid=(3, 7), root=tmp_path, max_workers=2
+    )
+    assert len(results) == 8
+    assert set(results["tower"]) == {"side_a", "side_b"}
+
+    # A rank above num_block_rows times the number of outputs is reported per row
+    valid = results["error"].isna()
+    assert valid.tolist() == (results["rank"] == 3).tolist()
+    assert (results.loc[valid, "fit_initial_ec"] > 90).all()
@@ -0,0 +1,156 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+from src.ingestion.device_simulator import encode_readings, replay_devices
+from src.ingestion.ingestion_service import (
+    IngestionService,
+    kalman_filter_factory,
+    parse_reading,
+)
+from src.state_estimation import kalman_filter
+
+
+def make_model():
+    rng = np.random.default_rng(0)
+    A = 0.5 * rng.standard_normal((3, 3))
+    B = rng.standard_normal((3, 5))
+    C = np.eye(3) + 0.1 * rng.standard_normal((3, 3))
+    D = 0.1 * rng.standard_normal((3, 5))
+    noise = rng.standard_normal((6, 6))
+    return A, B, C, D, noise @ noise.T + np.eye(6)
+
+
+def make_trajectory(num_rows=50):
+    rng = np.random.default_rng(1)
+    trajectory = pd.DataFrame(rng.random((num_rows, 5)), columns=INPUT_COLUMNS)
+    trajectory[OUTPUT_COLUMNS] = rng.random((num_rows, 3))
+    trajectory["time"] = np.arange(num_rows)
+    return trajectory
+
+
+async def run_service(service, trajectory, num_devices, extra_lines=()):
+    port = await service.start()
+    if extra_lines:
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.writelines(extra_lines)
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+    num_sent = await replay_devices(
+        "127.0.0.1", port, num_devices, trajectory=trajectory
+    )
+    await service.stop()
+    return num_sent
+
+
+# Test cases for parse_reading
+def test_parse_reading_with_missing_values():
+    tower, reading_time, u, y = parse_reading(
+        b'{"tower": "side_b", "time": 5, "initial_ec": 1938, "pH_down_mL": 2,'
+        b' "initial_ph": null}'
+    )
+    assert tower == "side_b" and reading_time == 5
+    assert np.array_equal(u, [2, 0, 0, 0, 0])
+    assert y[0] == 1938 and np.isnan(y[1:]).all()
+
+    # Null inputs are no dose as well
+    _, _, u, _ = parse_reading(b'{"tower": "side_b", "pH_down_mL": null}')
+    assert np.array_equal(u, np.zeros(5))
+
+
+def test_null_input_leaves_estimates_finite():
+    trajectory = make_trajectory(10)
+    trajectory["pH_down_mL"] = trajectory["pH_down_mL"].astype(object)
+    trajectory.loc[3, "pH_down_mL"] = None
+    lines = encode_readings("side_b", trajectory)
+    assert b'"pH_down_mL": null' in lines[3]
+    service = IngestionService(kalman_filter_factory(*make_model()))
+    service.process_batch([parse_reading(line) for line in lines])
+    assert service.num_readings == 10
+    assert np.isfinite(service.estimates["side_b"][1]).all()
+
+
+def test_kalman_filter_factory_solves_dare_once(monkeypatch):
+    num_solves = 0
+    solve = kalman_filter.solve_discrete_are
+
+    def counting_solve(*args, **kwargs):
+        nonlocal num_solves
+        num_solves += 1
+        return solve(*args, **kwargs)
+
+    monkeypatch.setattr(kalman_filter, "solve_discrete_are", counting_solve)
+    create = kalman_filter_factory(*make_model())
+    trajectory = make_trajectory(2)
+    U = trajectory[INPUT_COLUMNS].to_numpy()
+    Y = trajectory[OUTPUT_COLUMNS].to_numpy()
+    filters = [create(tower, U[i], Y[i]) for i, tower in enumerate(["a", "b"])]
+    assert num_solves == 1
+    assert not np.allclose(filters[0].x, filters[1].x)
+
+
+# Test cases for IngestionService
+def test_service_matches_offline_filter():
+    model = make_model()
+    trajectory = make_trajectory()
+    service = IngestionService(kalman_filter_factory(*model), window=0.01)
+    num_sent = asyncio.run(run_service(service, trajectory, num_devices=3))
+    assert num_sent == service.num_readings == 3 * len(trajectory)
+    assert set(service.estimates) == {"device_0", "device_1", "device_2"}
+
+    # Each tower is filtered exactly as the whole trajectory would be offline
+    U = trajectory[INPUT_COLUMNS].to_numpy()
+    Y = trajectory[OUTPUT_COLUMNS].to_numpy()
+    offline = kalman_filter_factory(*model)("device_0", U[0], Y[0]).filter(U, Y)
+    reading_time, estimate = service.estimates["device_1"]
+    assert reading_time == len(trajectory) - 1
+    assert np.allclose(estimate, offline[-1])
+
+
+def test_service_with_back_pressure_and_malformed_lines():
+    trajectory = make_trajectory()
+    service = IngestionService(
+        kalman_filter_factory(*make_model()), window=0.01, max_queue_size=1
+    )
+    num_sent = asyncio.run(
+        run_service(
+            service, trajectory, num_devices=5, extra_lines=[b"not json\n", b"{}\n"]
+        )
+    )
+    assert service.num_readings == num_sent == 5 * len(trajectory)
+    assert service.num_rejected == 2
+
+
+def test_service_with_failing_estimator_factory():
+    model = make_model()
+    trajectory = make_trajectory()
+    create = kalman_filter_factory(*model)
+
+    def factory(tower, u, y):
+        if tower == "bad":
+            raise np.linalg.LinAlgError("DARE failed")
+        return create(tower, u, y)
+
+    async def run():
+        service = IngestionService(factory, window=0.05)
+        port = await service.start()
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        lines = encode_readings("good", trajectory.iloc[:20])
+        writer.writelines([b'{"tower": "bad", "initial_ec": 1}\n'] + lines)
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+        # The worker keeps running for the readings that follow
+        num_sent = await replay_devices("127.0.0.1", port, 2, trajectory=trajectory)
+        await service.stop()
+        return service, num_sent
+
+    service, num_sent = asyncio.run(run())
+    assert service.num_failed == 1
+    assert isinstance(service.last_error, np.linalg.LinAlgError)
+    assert service.num_readings == 20 + num_sent
+    assert set(service.estimates) == {"good", "device_0", "device_1"}
+    assert service.estimates["good"][0] == 19
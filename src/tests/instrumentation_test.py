@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.instrumentation import instrumentation
+from src.instrumentation.instrumentation import instrumented, length_of, span
+from src.linear_control_system.batched_linear_control_system import (
+    BatchedLinearControlSystem,
+)
+from src.linear_control_system.linear_control_system import LinearControlSystem
+
+
+@pytest.fixture(autouse=True)
+def clean_instrumentation():
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+@instrumented(rows=length_of(0, "values"))
+def total(values):
+    return sum(values)
+
+
+# Test cases for spans and instrumented functions
+def test_disabled_records_nothing():
+    assert total([1, 2, 3]) == 6
+    with span("block") as block:
+        block.rows = 3
+    assert instrumentation.to_dict() == {}
+
+
+def test_instrumented_counts_calls_and_rows():
+    instrumentation.enable()
+    total([1, 2, 3])
+    total(values=[1, 2])
+    metrics = instrumentation.to_dict()["total"]
+    assert metrics["calls"] == 2
+    assert metrics["rows"] == 5
+    assert metrics["rows_per_second"] > 0
+    assert metrics["max_seconds"] <= metrics["seconds"]
+    assert "steps" not in metrics
+
+
+def test_span_counts_set_inside_block():
+    instrumentation.enable()
+    with span("block") as block:
+        block.steps = 10
+    assert instrumentation.to_dict()["block"]["steps"] == 10
+
+
+def test_linear_control_system_steps():
+    instrumentation.enable()
+    system = LinearControlSystem(0.5 * np.eye(2), np.ones((2, 1)), np.zeros(2))
+    system.rollout(np.ones((7, 1)))
+    system.calculate_next_state(np.ones(1))
+    BatchedLinearControlSystem.from_systems([system, system]).simulate(
+        np.ones((5, 2, 1))
+    )
+    metrics = instrumentation.to_dict()
+    assert metrics["LinearControlSystem.rollout"]["steps"] == 7
+    assert metrics["LinearControlSystem.precompute_rollout"]["calls"] == 1
+    assert metrics["BatchedLinearControlSystem.simulate"]["steps"] == 5
+
+    # Single steps are left uninstrumented
+    assert "LinearControlSystem.calculate_next_state" not in metrics
+
+
+def test_peak_memory_of_nested_spans():
+    instrumentation.enable(track_memory=True)
+    with span("outer"):
+        with span("inner"):
+            data = np.ones(1_000_000)
+        del data
+        small = np.ones(10)
+    metrics = instrumentation.to_dict()
+    assert metrics["inner"]["peak_memory_bytes"] >= 8_000_000
+    assert (
+        metrics["outer"]["peak_memory_bytes"] >= metrics["inner"]["peak_memory_bytes"]
+    )
+    assert small.sum() == 10
+
+
+# Test cases for exporting
+def test_export_json_and_prometheus(tmp_path):
+    instrumentation.enable()
+    total([1, 2, 3])
+    json_path = tmp_path / "metrics.json"
+    instrumentation.export(str(json_path))
+    assert json.loads(json_path.read_text())["total"]["rows"] == 3
+
+    prometheus_path = tmp_path / "metrics.prom"
+    text = instrumentation.export(str(prometheus_path))
+    assert prometheus_path.read_text() == text
+    lines = text.splitlines()
+    assert "# TYPE indoor_farm_span_calls_total counter" in lines
+    assert 'indoor_farm_span_rows_total{span="total"} 3' in lines
+    assert not any(line.startswith("indoor_farm_span_steps_total") for line in lines)
@@ -0,0 +1,155 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_pipeline.interpolation import (
+    append_interpolated_data,
+    StreamingInterpolator,
+    interpolate_daily_system_data,
+)
+
+COLUMNS = ["initial_ec", "initial_ph"]
+
+
+def make_cleaned_data():
+    return pd.DataFrame(
+        {
+            "date": [f"1/{day}/2023" for day in range(1, 11)],
+            "initial_ec": [
+                np.nan,
+                2000,
+                np.nan,
+                np.nan,
+                2300,
+                2310,
+                np.nan,
+                2400,
+                2410,
+                np.nan,
+            ],
+            "initial_ph": [
+                6.0,
+                np.nan,
+                6.2,
+                6.3,
+                np.nan,
+                np.nan,
+                np.nan,
+                np.nan,
+                6.1,
+                6.0,
+            ],
+            "water_gallons": np.arange(10.0),
+        }
+    )
+
+
+def test_interpolate_daily_system_data():
+    interpolated = interpolate_daily_system_data(make_cleaned_data(), COLUMNS)
+    assert np.isnan(interpolated["initial_ec"][0])
+    assert np.allclose(interpolated["initial_ec"][1:5], [2000, 2100, 2200, 2300])
+    assert interpolated["initial_ec"][9] == 2410
+    assert np.allclose(interpolated["initial_ph"][1], 6.1)
+    assert interpolated["date"][0] == pd.Timestamp("2023-01-01")
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 4, 10])
+def test_streaming_interpolator_matches_batch(chunksize):
+    df = make_cleaned_data()
+    interpolator = StreamingInterpolator(COLUMNS)
+    chunks = [
+        interpolator.update(df.iloc[start : start + chunksize])
+        for start in range(0, len(df), chunksize)
+    ]
+    chunks.append(interpolator.flush())
+    streamed = pd.concat(chunks, ignore_index=True)
+    expected = interpolate_daily_system_data(df, COLUMNS)
+    pd.testing.assert_frame_equal(streamed, expected)
+
+
+def test_append_interpolated_data_matches_batch(tmp_path):
+    df = make_cleaned_data()
+    output_path = tmp_path / "interpolated.csv"
+    state_path = tmp_path / "interpolated_state.json"
+    for start in range(0, len(df), 3):
+        append_interpolated_data(
+            df.iloc[start : start + 3], output_path, state_path, COLUMNS
+        )
+    appended = pd.read_csv(output_path, parse_dates=["date"])
+    expected = interpolate_daily_system_data(df, COLUMNS)
+    pd.testing.assert_frame_equal(appended, expected, check_dtype=False)
+
+
+def test_append_interpolated_data_rewrites_only_open_gap(tmp_path):
+    df = make_cleaned_data()
+    output_path = tmp_path / "interpolated.csv"
+    state_path = tmp_path / "interpolated_state.json"
+    append_interpolated_data(df.iloc[:6], output_path, state_path, COLUMNS)
+    before = output_path.read_bytes()
+
+    # Rows up to the last pH observation (row 3) are settled and stay untouched
+    num_rows = append_interpolated_data(df.iloc[6:9], output_path, state_path, COLUMNS)
+    assert num_rows == 5
+    after = output_path.read_bytes()
+    settled_bytes = len(b"".join(before.splitlines(keepends=True)[:5]))
+    assert after[:settled_bytes] == before[:settled_bytes]
+    assert np.allclose(
+        pd.read_csv(output_path)["initial_ph"][4:9], [6.26, 6.22, 6.18, 6.14, 6.1]
+    )
+
+
+def make_long_log(num_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2023-01-01", periods=num_rows),
+            "initial_ec": 2000 + rng.normal(0, 50, num_rows),
+            "initial_ph": np.nan,
+        }
+    )
+    # pH is measured once, EC stops being measured for a while
+    df.loc[10, "initial_ph"] = 6.2
+    df.loc[2000:2040, "initial_ec"] = np.nan
+    df.loc[3000:3029, "initial_ec"] = np.nan
+    return df
+
+
+def test_interpolate_leaves_long_gaps_missing():
+    df = make_long_log(4000)
+    interpolated = interpolate_daily_system_data(df, COLUMNS, max_gap=30)
+    assert interpolated["initial_ec"][2000:2041].isna().all()
+    assert interpolated["initial_ec"][3000:3030].notna().all()
+    # The trailing gap after the only pH measurement is too long as well
+    assert interpolated["initial_ph"][10] == 6.2
+    assert interpolated["initial_ph"][11:].isna().all()
+
+
+def test_streaming_interpolator_bounds_pending_rows():
+    df = make_long_log(5000)
+    interpolator = StreamingInterpolator(COLUMNS, max_gap=30)
+    chunks = []
+    for start in range(0, len(df), 100):
+        chunks.append(interpolator.update(df.iloc[start : start + 100]))
+        assert len(interpolator.pending) <= 30
+    chunks.append(interpolator.flush())
+    streamed = pd.concat(chunks, ignore_index=True)
+    expected = interpolate_daily_system_data(df, COLUMNS, max_gap=30)
+    pd.testing.assert_frame_equal(streamed, expected)
+
+
+def test_append_interpolated_data_bounds_state(tmp_path):
+    df = make_long_log(3000)
+    output_path = tmp_path / "interpolated.csv"
+    state_path = tmp_path / "interpolated_state.json"
+    for start in range(0, len(df), 100):
+        append_interpolated_data(
+            df.iloc[start : start + 100], output_path, state_path, COLUMNS, max_gap=30
+        )
+        # Only the rows of the open gaps are kept, together with their anchors
+        state = json.loads(state_path.read_text())
+        assert len(state["pending"]["data"]) <= 30
+    appended = pd.read_csv(output_path, parse_dates=["date"])
+    expected = interpolate_daily_system_data(df, COLUMNS, max_gap=30)
+    pd.testing.assert_frame_equal(appended, expected, check_dtype=False)
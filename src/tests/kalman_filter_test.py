@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from src.linear_control_system.linear_control_system import LinearControlSystem
+from src.state_estimation.kalman_filter import BatchedKalmanFilter, KalmanFilter
+
+
+def make_system(seed=0):
+    rng = np.random.default_rng(seed)
+    A = np.array([[0.9, 0.1, 0.0], [0.0, 0.8, 0.1], [0.0, 0.0, 0.7]])
+    B = rng.standard_normal((3, 2))
+    C = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 1.0]])
+    D = 0.1 * rng.standard_normal((2, 2))
+    return LinearControlSystem(A, B, np.zeros(3), C, D)
+
+
+def iterate_riccati(A, C, Q, R, S, num_iterations=2000):
+    P = np.eye(A.shape[0])
+    for _ in range(num_iterations):
+        K = (A @ P @ C.T + S) @ np.linalg.inv(C @ P @ C.T + R)
+        P = A @ P @ A.T + Q - K @ (C @ P @ A.T + S.T)
+    return P, K
+
+
+def test_steady_state_gain_matches_riccati_iteration():
+    system = make_system()
+    Q = 0.1 * np.eye(3)
+    R = np.diag([0.5, 0.2])
+    S = np.array([[0.01, 0.0], [0.0, 0.02], [0.0, 0.0]])
+    kalman_filter = KalmanFilter(system, Q, R, S)
+    P, K = iterate_riccati(system.A, system.C, Q, R, S)
+    assert np.allclose(kalman_filter.P, P)
+    assert np.allclose(kalman_filter.gain(np.array([True, True]))[1], K)
+
+
+def test_from_noise_covariance():
+    system = make_system()
+    noise_covariance = np.diag([0.5, 0.2, 0.1, 0.1, 0.1])
+    kalman_filter = KalmanFilter.from_noise_covariance(system, noise_covariance)
+    assert np.allclose(kalman_filter.R, np.diag([0.5, 0.2]))
+    assert np.allclose(kalman_filter.Q, 0.1 * np.eye(3))
+
+
+def test_copy_shares_steady_state_solution():
+    system = make_system()
+    kalman_filter = KalmanFilter.from_noise_covariance(system, 0.1 * np.eye(5))
+    other = kalman_filter.copy([1.0, 2.0, 3.0])
+    assert other.P is kalman_filter.P
+    assert np.array_equal(kalman_filter.x, np.zeros(3))
+
+    # The copy filters like a filter of its own started from the same state
+    system.x = np.array([1.0, 2.0, 3.0])
+    expected = KalmanFilter.from_noise_covariance(system, 0.1 * np.eye(5))
+    U, _, Y = simulate_noisy(system, 20)
+    Y[::4, 0] = np.nan
+    assert np.allclose(other.filter(U, Y), expected.filter(U, Y))
+
+
+def simulate_noisy(system, num_steps, seed=1):
+    rng = np.random.default_rng(seed)
+    U = rng.standard_normal((num_steps, 2))
+    x = np.zeros(3)
+    X, Y = [], []
+    for u in U:
+        X.append(x)
+        Y.append(system.C @ x + system.D @ u + rng.normal(0, 0.5, 2))
+        x = system.A @ x + system.B @ u + rng.normal(0, 0.3, 3)
+    return U, np.array(X), np.array(Y)
+
+
+def test_filter_estimates_state_with_missing_readings():
+    system = make_system()
+    U, X, Y = simulate_noisy(system, 500)
+    Y[::3, 1] = np.nan
+    Y[::7] = np.nan
+    kalman_filter = KalmanFilter(system, 0.09 * np.eye(3), 0.25 * np.eye(2))
+    filtered = kalman_filter.filter(U, Y)
+    assert not np.isnan(filtered).any()
+    filter_error = np.sqrt(np.mean((filtered - X) ** 2))
+    open_loop_error = np.sqrt(np.mean((system.rollout(U)[:-1] - X) ** 2))
+    assert filter_error < 0.75 * open_loop_error
+    # Gains for complete readings and for the second output missing. Rows without
+    # any reading only predict.
+    assert len(kalman_filter._gains) == 2
+
+
+def test_batched_filter_matches_individual_filters():
+    systems = [make_system(seed) for seed in range(4)]
+    filters = [KalmanFilter(s, 0.09 * np.eye(3), 0.25 * np.eye(2)) for s in systems]
+    batch = BatchedKalmanFilter(
+        [KalmanFilter(s, 0.09 * np.eye(3), 0.25 * np.eye(2)) for s in systems]
+    )
+    rng = np.random.default_rng(2)
+    for k in range(10):
+        U = rng.standard_normal((4, 2))
+        Y = rng.standard_normal((4, 2))
+        Y[k % 4, k % 2] = np.nan
+        filtered = batch.update(U, Y)
+        for i, kalman_filter in enumerate(filters):
+            assert np.allclose(filtered[i], kalman_filter.update(U[i], Y[i]))
+            assert np.allclose(batch.x[i], kalman_filter.x)
+
+
+def test_batched_filter_add_and_update_some_towers():
+    systems = [make_system(seed) for seed in range(3)]
+    filters = [KalmanFilter(s, 0.09 * np.eye(3), 0.25 * np.eye(2)) for s in systems]
+    batch = BatchedKalmanFilter(
+        [KalmanFilter(systems[0], 0.09 * np.eye(3), 0.25 * np.eye(2))]
+    )
+    added = batch.add(
+        [KalmanFilter(s, 0.09 * np.eye(3), 0.25 * np.eye(2)) for s in systems[1:]]
+    )
+    assert added.tolist() == [1, 2]
+    rng = np.random.default_rng(3)
+    for indices in ([0, 2], [1], [2, 1, 0]):
+        U = rng.standard_normal((len(indices), 2))
+        Y = rng.standard_normal((len(indices), 2))
+        Y[0, 1] = np.nan
+        filtered = batch.update(U, Y, indices)
+        for k, i in enumerate(indices):
+            assert np.allclose(filtered[k], filters[i].update(U[k], Y[k]))
+    for i, kalman_filter in enumerate(filters):
+        assert np.allclose(batch.x[i], kalman_filter.x)
+
+
+def test_filter_requires_C():
+    system = LinearControlSystem(np.eye(2), np.ones((2, 1)), np.zeros(2))
+    with pytest.raises(ValueError):
+        KalmanFilter(system, np.eye(2), np.eye(1))
@@ -135,3 +135,292 @@ def test_controllability_matrix():
     assert np.allclose(rank, expected_rank)
     assert controllable == expected_controllable
     assert np.allclose(controllability_matrix, expected_controllability_matrix)
+
+
+# Test cases for rollout
+def make_rollout_system():
+    rng = np.random.default_rng(0)
+    A = 0.5 * rng.standard_normal((3, 3))
+    B = rng.standard_normal((3, 5))
+    x = rng.standard_normal(3)
+    return LinearControlSystem(A, B, x)
+
+
+def test_rollout_matches_calculate_next_state():
+    system = make_rollout_system()
+    U = np.random.default_rng(1).standard_normal((12, 5))
+    trajectory = system.rollout(U)
+    assert trajectory.shape == (13, 3)
+    assert np.allclose(trajectory[0], system.x)
+    for t in range(U.shape[0]):
+        assert np.allclose(trajectory[t + 1], system.calculate_next_state(U[t]))
+
+
+def test_rollout_final_state():
+    system = make_rollout_system()
+    system.precompute_rollout(20)
+    U = np.random.default_rng(2).standard_normal((7, 5))
+    assert np.allclose(system.rollout_final_state(U), system.rollout(U)[-1])
+
+
+def test_rollout_cache_dropped_when_matrices_change():
+    system = make_rollout_system()
+    system.precompute_rollout(5)
+    system.A = np.eye(3)
+    assert system._rollout_cache is None
+    U = np.ones((4, 5))
+    expected = system.x + np.arange(1, 5)[:, None] * (system.B @ np.ones(5))
+    assert np.allclose(system.rollout(U)[1:], expected)
+    system.B = np.zeros((3, 5))
+    assert system._rollout_cache is None
+    assert np.allclose(system.rollout_final_state(U), system.x)
+
+
+def test_rollout_with_invalid_dimensions():
+    system = make_rollout_system()
+    with pytest.raises(ValueError):
+        system.rollout(np.zeros((4, 4)))
+
+
+def test_controllability_rank_only():
+    A = np.array([[-0.01, 0, 0], [-0.01, -0.05, 0], [-0.01, 0, -0.05]])
+    B = np.array(
+        [
+            [0.2, -0.2, 0.01, 0.01, 0.01],
+            [-0.01, 0.01, 0.1, -0.1, 0.05],
+            [-0.01, 0.01, 0.05, -0.05, 0.1],
+        ]
+    )
+    system = LinearControlSystem(A, B, np.zeros(A.shape[0]))
+    assert system.compute_controllability_matrix(rank_only=True) == (3, True)
+
+    # A single input acting on one decoupled state only reaches that state
+    system = LinearControlSystem(
+        np.diag([0.5, 0.2, 0.1]), np.array([[1], [0], [0]]), np.zeros(3)
+    )
+    _, rank, controllable = system.compute_controllability_matrix()
+    assert (rank, controllable) == (1, False)
+    assert system.compute_controllability_matrix(rank_only=True) == (1, False)
+
+
+def test_observability_matrix():
+    A = np.array([[0.9, 1.0, 0.0], [0.0, 0.8, 1.0], [0.0, 0.0, 0.7]])
+    system = LinearControlSystem(A, np.ones((3, 1)), np.zeros(3))
+    system.C = np.array([[1.0, 0.0, 0.0]])
+    observability_matrix, rank, observable = system.compute_observability_matrix()
+    expected_observability_matrix = np.vstack(
+        (system.C, system.C @ A, system.C @ A @ A)
+    )
+    assert np.allclose(observability_matrix, expected_observability_matrix)
+    assert (rank, observable) == (3, True)
+    assert system.compute_observability_matrix(rank_only=True) == (3, True)
+
+    # Measuring only the last state of the chain does not observe the others
+    system.C = np.array([[0.0, 0.0, 1.0]])
+    assert system.compute_observability_matrix()[1:] == (1, False)
+    assert system.compute_observability_matrix(rank_only=True) == (1, False)
+
+
+def test_initialization_with_output_matrices():
+    A = np.eye(3)
+    B = np.ones((3, 2))
+    C = np.ones((1, 3))
+    D = np.zeros((1, 2))
+    system = LinearControlSystem(A, B, np.zeros(3), C, D)
+    assert np.array_equal(system.C, C)
+    assert np.array_equal(system.D, D)
+    with pytest.raises(ValueError):
+        LinearControlSystem(A, B, np.zeros(3), np.ones((1, 2)))
+    with pytest.raises(ValueError):
+        LinearControlSystem(A, B, np.zeros(3), C, np.zeros((1, 3)))
+
+
+def test_observability_requires_C():
+    system = LinearControlSystem(np.eye(2), np.ones((2, 1)), np.zeros(2))
+    with pytest.raises(ValueError):
+        system.compute_observability_matrix()
+
+
+# Test cases for the hot path
+def test_step_matches_calculate_next_state():
+    rng = np.random.default_rng(0)
+    A = rng.standard_normal((3, 3))
+    B = rng.standard_normal((3, 2))
+    x = rng.standard_normal(3)
+    system = LinearControlSystem(A, B, x.copy())
+    reference = LinearControlSystem(A, B, x.copy())
+    system.enable_hot_path()
+    state = system.x
+    for u in rng.standard_normal((5, 2)):
+        next_x = system.step(u)
+        assert next_x is state
+        assert np.allclose(next_x, reference.calculate_next_state(u))
+
+
+def test_step_with_float32_and_out():
+    A = np.array([[1, 2], [3, 4]])
+    B = np.array([[5], [6]])
+    system = LinearControlSystem(A, B, np.array([7, 8])).enable_hot_path(np.float32)
+    assert system.A.dtype == np.float32 and system.A.flags.c_contiguous
+    out = np.empty(2, dtype=np.float32)
+    assert system.step(np.array([9], dtype=np.float32), out=out) is out
+    assert np.array_equal(out, np.array([68, 107]))
+
+
+def test_step_requires_hot_path():
+    system = LinearControlSystem(np.eye(2), np.ones((2, 1)), np.zeros(2))
+    with pytest.raises(ValueError):
+        system.step(np.ones(1))
+    system.enable_hot_path()
+    system.A = 2 * np.eye(2)
+    with pytest.raises(ValueError):
+        system.step(np.ones(1))
+
+
+def test_hot_path_state_assignment_keeps_buffer():
+    system = LinearControlSystem(np.eye(2), np.ones((2, 1)), np.zeros(2))
+    system.enable_hot_path()
+    state = system.x
+    system.x = np.array([1, 2])
+    assert system.x is state
+    assert np.array_equal(system.step(np.zeros(1)), [1, 2])
+
+
+def test_slots():
+    system = LinearControlSystem(np.eye(2), np.ones((2, 1)), np.zeros(2))
+    assert not hasattr(system, "__dict__")
+    with pytest.raises(AttributeError):
+        system.unknown = 1
+
+
+# Test cases for Gramians and balanced truncation
+def make_stable_system(n=6, m=2, p=3, seed=0):
+    rng = np.random.default_rng(seed)
+    A = rng.standard_normal((n, n))
+    A *= 0.9 / np.max(np.abs(np.linalg.eigvals(A)))
+    return LinearControlSystem(
+        A,
+        rng.standard_normal((n, m)),
+        rng.standard_normal(n),
+        rng.standard_normal((p, n)),
+        rng.standard_normal((p, m)),
+    )
+
+
+def markov_parameters(system, num_steps=40):
+    return np.array(
+        [
+            system.C @ np.linalg.matrix_power(system.A, k) @ system.B
+            for k in range(num_steps)
+        ]
+    )
+
+
+def test_gramians_solve_lyapunov_equations():
+    system = make_stable_system()
+    A, B, C = system.A, system.B, system.C
+    W_c = system.compute_controllability_gramian()
+    W_o = system.compute_observability_gramian()
+    assert np.allclose(A @ W_c @ A.T - W_c + B @ B.T, 0)
+    assert np.allclose(A.T @ W_o @ A - W_o + C.T @ C, 0)
+
+
+def test_gramians_with_unstable_A():
+    system = LinearControlSystem(
+        np.array([[1.1, 0], [0, 0.5]]), np.ones((2, 1)), np.zeros(2), np.ones((1, 2))
+    )
+    with pytest.raises(ValueError):
+        system.compute_controllability_gramian()
+    with pytest.raises(ValueError):
+        system.compute_observability_gramian()
+
+
+def test_balanced_truncation_balances_gramians():
+    system = make_stable_system()
+    balanced, hankel_singular_values = system.balanced_truncation(order=6)
+    assert np.allclose(hankel_singular_values, system.compute_hankel_singular_values())
+    assert np.allclose(
+        balanced.compute_controllability_gramian(), np.diag(hankel_singular_values)
+    )
+    assert np.allclose(
+        balanced.compute_observability_gramian(), np.diag(hankel_singular_values)
+    )
+    assert np.allclose(markov_parameters(balanced), markov_parameters(system))
+
+
+def test_balanced_truncation_removes_uncontrollable_states():
+    # Two extra states that the inputs never reach
+    minimal = make_stable_system(n=3)
+    A = np.zeros((5, 5))
+    A[:3, :3] = minimal.A
+    A[3:, 3:] = 0.5 * np.eye(2)
+    B = np.vstack([minimal.B, np.zeros((2, 2))])
+    C = np.hstack([minimal.C, np.ones((3, 2))])
+    system = LinearControlSystem(A, B, np.zeros(5), C, minimal.D)
+    reduced, hankel_singular_values = system.balanced_truncation()
+    assert reduced.A.shape == (3, 3)
+    assert np.allclose(hankel_singular_values[3:], 0)
+    assert np.allclose(markov_parameters(reduced), markov_parameters(system))
+
+
+def test_balanced_truncation_error_bound():
+    system = make_stable_system()
+    reduced, hankel_singular_values = system.balanced_truncation(order=4)
+    error = np.abs(markov_parameters(reduced) - markov_parameters(system)).max()
+    assert error <= 2 * hankel_singular_values[4:].sum()
+
+
+def test_balanced_truncation_with_invalid_order():
+    with pytest.raises(ValueError):
+        make_stable_system().balanced_truncation(order=0)
+
+
+# Test cases for memoized analysis
+def test_analysis_is_memoized_until_matrices_change():
+    system = make_stable_system()
+    eigenvalues, _ = system.compute_A_eigen()
+    assert system.compute_A_eigen()[0] is eigenvalues
+    assert not eigenvalues.flags.writeable
+    controllability_matrix, _, _ = system.compute_controllability_matrix()
+    observability_matrix, _, _ = system.compute_observability_matrix()
+    gramian = system.compute_observability_gramian()
+
+    version = system.version
+    system.B = 2 * system.B
+    assert system.version > version
+    assert system.compute_A_eigen()[0] is not eigenvalues
+    assert np.allclose(
+        system.compute_controllability_matrix()[0], 2 * controllability_matrix
+    )
+    assert system.compute_observability_matrix()[0] is not observability_matrix
+
+    system.C = 3 * system.C
+    assert np.allclose(system.compute_observability_gramian(), 9 * gramian)
+
+
+def test_memoized_analysis_keys_on_arguments():
+    system = make_stable_system()
+    assert system.compute_controllability_matrix(rank_only=True) == (6, True)
+    assert len(system.compute_controllability_matrix()) == 3
+
+
+def test_copy_shares_matrices_and_analysis():
+    system = make_stable_system()
+    eigenvalues, _ = system.compute_A_eigen()
+    x = system.x.copy()
+    copy = system.copy(np.ones(6))
+    assert copy.A is system.A and copy.compute_A_eigen()[0] is eigenvalues
+    copy.calculate_next_state(np.ones(2))
+    assert np.array_equal(system.x, x)
+
+    # Reassigning a matrix of the copy leaves the original and its analysis alone
+    copy.A = 0.5 * system.A
+    assert np.allclose(copy.compute_A_eigen()[0], 0.5 * eigenvalues)
+    assert system.compute_A_eigen()[0] is eigenvalues
+
+
+def test_stability():
+    assert make_stable_system().is_stable()
+    system = LinearControlSystem(np.diag([1.1, 0.5]), np.ones((2, 1)), np.zeros(2))
+    assert np.isclose(system.compute_spectral_radius(), 1.1)
+    assert not system.is_stable()
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from src.constants import TARGET_BANDS
+from src.linear_control_system.linear_control_system import LinearControlSystem
+from src.model_predictive_control.model_predictive_control import (
+    INPUT_BOUNDS,
+    ModelPredictiveController,
+)
+
+
+def make_tower_model():
+    # States are EC, pH and volume. Nutrients raise EC and volume, water raises
+    # volume and dilutes EC, pH Down and pH Up move pH. Volume is slowly consumed.
+    A = np.diag([1.0, 1.0, 0.95])
+    B = np.array(
+        [
+            [0, 0, 150, 150, -100],
+            [-0.05, 0.05, 0, 0, 0],
+            [0, 0, 1, 1, 1],
+        ]
+    )
+    C = np.eye(3)
+    D = np.zeros((3, 5))
+    return LinearControlSystem(A, B, np.array([1800.0, 6.8, 4.5])), C, D
+
+
+def test_controller_keeps_outputs_in_bands():
+    system, C, D = make_tower_model()
+    controller = ModelPredictiveController(system, C, D, horizon=10)
+    bands = np.array(list(TARGET_BANDS.values()))
+    bounds = np.array(list(INPUT_BOUNDS.values()))
+    for day in range(10):
+        u = controller.solve()
+        assert np.all(u >= bounds[:, 0]) and np.all(u <= bounds[:, 1] + 1e-12)
+        system.calculate_next_state(u)
+    assert np.all(system.x >= bands[:, 0] - 1e-2)
+    assert np.all(system.x <= bands[:, 1] + 1e-2)
+
+
+def test_controller_doses_only_when_needed():
+    system, C, D = make_tower_model()
+    system.x = np.array([2200.0, 6.2, 5.9])
+    controller = ModelPredictiveController(system, C, D, horizon=3)
+    assert np.allclose(controller.solve(), 0)
+
+
+def test_controller_warm_start():
+    system, C, D = make_tower_model()
+    controller = ModelPredictiveController(system, C, D, horizon=10)
+    u = controller.solve(warm_start=False)
+    cold_iterations = controller.iterations
+    controller.solve(system.A @ system.x + system.B @ u)
+    assert controller.iterations <= cold_iterations
+    predicted = controller.predict_outputs(system.A @ system.x + system.B @ u)
+    assert predicted.shape == (10, 3)
+
+
+def test_controller_with_invalid_dimensions():
+    system, C, D = make_tower_model()
+    with pytest.raises(ValueError):
+        ModelPredictiveController(system, C[:2], D)
+
+
+def test_controller_with_invalid_max_iterations():
+    system, C, D = make_tower_model()
+    with pytest.raises(ValueError):
+        ModelPredictiveController(system, C, D, max_iterations=0)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from src.model_registry.model_registry import ModelRegistry, parse_model_name
+
+
+def make_matrices(seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        0.5 * rng.standard_normal((3, 3)),
+        rng.standard_normal((3, 5)),
+        rng.standard_normal((3, 3)),
+        rng.standard_normal((3, 5)),
+    )
+
+
+def test_parse_model_name():
+    assert parse_model_name("win23_subset_zip_grow_tower_side_b_simulated") == (
+        "subset_zip_grow_tower_side_b",
+        "win23",
+    )
+    with pytest.raises(ValueError):
+        parse_model_name("tower")
+
+
+def test_registry_loads_npz_and_npy_models(tmp_path):
+    A, B, C, D = make_matrices()
+    np.savez(tmp_path / "win23_side_a_simulated.npz", A=A, B=B, C=C, D=D)
+    (tmp_path / "notes.txt").write_text("not a model")
+    registry = ModelRegistry(root=tmp_path)
+    registry.save_model("side_b", "spr23", *make_matrices(1))
+    assert registry.models() == [("side_a", "win23"), ("side_b", "spr23")]
+
+    model = registry.get_model("side_a", "win23")
+    assert np.array_equal(model.system.A, A)
+    assert np.array_equal(model.D, D)
+    assert np.allclose(
+        np.sort_complex(model.eigenvalues), np.sort_complex(np.linalg.eigvals(A))
+    )
+
+    # Matrices stored as .npy files are memory-mapped
+    assert isinstance(registry.get_system("side_b", "spr23").A, np.memmap)
+
+    with pytest.raises(KeyError):
+        registry.get_model("side_c", "win23")
+
+
+def test_registry_lru_cache(tmp_path):
+    registry = ModelRegistry(root=tmp_path, max_cached_models=2)
+    for i, tower in enumerate(["a", "b", "c"]):
+        registry.save_model(tower, "win23", *make_matrices(i))
+    system = registry.get_system("a", "win23")
+    assert registry.get_system("a", "win23").A is system.A
+    registry.get_system("b", "win23")
+    registry.get_system("c", "win23")
+    # "a" was the least recently used model and has been evicted
+    assert registry.get_system("a", "win23").A is not system.A
+    assert (registry.hits, registry.misses) == (1, 4)
+
+    # Saving a model again drops its cached system
+    registry.save_model("a", "win23", *make_matrices(5))
+    assert np.array_equal(registry.get_system("a", "win23").A, make_matrices(5)[0])
+
+
+def test_registry_hands_out_independent_systems(tmp_path):
+    A, B, C, D = make_matrices()
+    np.savez(tmp_path / "win23_side_a_simulated.npz", A=A, B=B, C=C, D=D)
+    registry = ModelRegistry(root=tmp_path)
+    first = registry.get_system("side_a", "win23")
+    second = registry.get_system("side_a", "win23")
+
+    # The state, hot path and rollouts of one caller do not reach the other
+    first.x = np.ones(3)
+    first.enable_hot_path()
+    first.precompute_rollout(5)
+    assert np.array_equal(second.x, np.zeros(3))
+    with pytest.raises(ValueError):
+        second.step(np.zeros(5))
+    assert np.allclose(second.rollout(np.zeros((2, 5)))[-1], 0)
+
+    # The matrices and the memoized analysis are shared and cannot be modified
+    eigenvalues, _ = second.compute_A_eigen()
+    assert eigenvalues is registry.get_model("side_a", "win23").eigenvalues
+    with pytest.raises(ValueError):
+        second.A[0, 0] = 1
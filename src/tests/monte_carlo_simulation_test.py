@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from src.uncertainty_propagation.monte_carlo_simulation import MonteCarloSimulation
+
+
+def make_model():
+    A = np.diag([0.9, 0.8, 0.95])
+    B = np.array([[100, 0, 0], [0, 0.1, 0], [0, 0, 0.5]])
+    C = np.eye(3)
+    D = np.zeros((3, 3))
+    return A, B, C, D
+
+
+def deterministic_outputs(A, B, C, D, x, U):
+    outputs = []
+    for u in U:
+        outputs.append(C @ x + D @ u)
+        x = A @ x + B @ u
+    return np.array(outputs)
+
+
+def deterministic_out_of_band(outputs):
+    band_min = np.array([2000, 6, 5])
+    band_max = np.array([2400, 6.4, 6])
+    return (outputs < band_min) | (outputs > band_max)
+
+
+def test_propagate_without_noise_is_deterministic():
+    A, B, C, D = make_model()
+    x = np.array([2200.0, 6.2, 5.5])
+    U = np.random.default_rng(0).random((20, 3))
+    simulation = MonteCarloSimulation(A, B, C, D, np.zeros((6, 6)))
+    percentiles, out_of_band, _ = simulation.propagate(x, U, num_samples=10)
+    expected = deterministic_outputs(A, B, C, D, x, U)
+    assert percentiles.shape == (3, 20, 3)
+    for band in percentiles:
+        assert np.allclose(band, expected)
+    assert np.array_equal(out_of_band > 0, deterministic_out_of_band(expected))
+
+
+def test_propagate_noise_spread():
+    A, B, C, D = make_model()
+    noise_covariance = np.diag([100.0, 0.01, 0.04, 0, 0, 0])
+    simulation = MonteCarloSimulation(A, B, C, D, noise_covariance)
+    x = np.array([2200.0, 6.2, 5.5])
+    percentiles, _, ever_out_of_band = simulation.propagate(
+        x, np.zeros((1, 3)), num_samples=20_000, percentiles=(16, 84), seed=1
+    )
+    # Measurement noise only, so one standard deviation either side of the output
+    assert np.allclose(percentiles[1, 0] - percentiles[0, 0], [20, 0.2, 0.4], rtol=0.05)
+    # The pH band is 2 standard deviations either side of 6.2
+    assert ever_out_of_band[1] == pytest.approx(0.0455, abs=0.01)
+
+
+def test_propagate_parameter_realizations():
+    A, B, C, D = make_model()
+    x = np.array([2200.0, 6.2, 5.5])
+    U = np.ones((5, 3))
+    simulation = MonteCarloSimulation(
+        A, B, C, D, np.zeros((6, 6)), parameter_covariance=np.zeros((18, 18))
+    )
+    percentiles, _, _ = simulation.propagate(x, U, num_samples=4)
+    assert np.allclose(percentiles[1], deterministic_outputs(A, B, C, D, x, U))
+
+    parameter_covariance = np.zeros((18, 18))
+    parameter_covariance[0, 0] = 1e-4
+    simulation.parameter_factor = np.sqrt(parameter_covariance)
+    percentiles, _, _ = simulation.propagate(x, U, num_samples=1000, seed=2)
+    assert np.all(percentiles[2, 1:, 0] > percentiles[0, 1:, 0])
+    assert np.allclose(percentiles[2, :, 1:], percentiles[0, :, 1:])
+
+
+def test_from_npz(tmp_path):
+    A, B, C, D = make_model()
+    np.savez(tmp_path / "model.npz", A=A, B=B, C=C, D=D)
+    with pytest.raises(ValueError):
+        MonteCarloSimulation.from_npz(tmp_path / "model.npz")
+    np.savez(tmp_path / "model.npz", A=A, B=B, C=C, D=D, covariance=np.eye(6))
+    simulation = MonteCarloSimulation.from_npz(tmp_path / "model.npz")
+    assert np.allclose(simulation.noise_factor @ simulation.noise_factor.T, np.eye(6))
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+from src.data_pipeline.parquet_storage import read_stage, write_stage
+
+
+def make_interpolated_data(num_rows=5):
+    return pd.DataFrame(
+        {
+            "date": [f"2023-01-{day:02d}" for day in range(1, num_rows + 1)],
+            "initial_ec": np.linspace(2000, 2400, num_rows),
+            "initial_ph": ["6.1"] * num_rows,
+            "water_gallons": np.arange(num_rows, dtype=float),
+        }
+    )
+
+
+def test_write_and_read_stage(tmp_path):
+    write_stage(
+        make_interpolated_data(), "interpolated", "side_a", "win23", root=tmp_path
+    )
+    write_stage(
+        make_interpolated_data(3), "interpolated", "side_b", "win23", root=tmp_path
+    )
+    df = read_stage("interpolated", root=tmp_path)
+    assert len(df) == 8
+    assert df["date"].dtype.kind == "M"
+    assert df["initial_ph"].dtype == float
+    assert df["tower"].tolist() == ["side_a"] * 5 + ["side_b"] * 3
+
+
+def test_read_stage_projection_and_filters(tmp_path):
+    write_stage(
+        make_interpolated_data(), "interpolated", "side_a", "win23", root=tmp_path
+    )
+    write_stage(
+        make_interpolated_data(), "interpolated", "side_a", "spr23", root=tmp_path
+    )
+    df = read_stage(
+        "interpolated",
+        columns=["date", "initial_ec"],
+        tower="side_a",
+        season="spr23",
+        filter=ds.field("initial_ec") > 2100,
+        root=tmp_path,
+    )
+    assert list(df.columns) == ["date", "initial_ec"]
+    assert np.allclose(df["initial_ec"], [2200, 2300, 2400])
+
+
+def test_write_stage_replaces_partition(tmp_path):
+    write_stage(make_interpolated_data(), "cleaned", "side_a", "win23", root=tmp_path)
+    write_stage(make_interpolated_data(2), "cleaned", "side_a", "win23", root=tmp_path)
+    assert len(read_stage("cleaned", root=tmp_path)) == 2
+
+
+def test_unknown_stage(tmp_path):
+    with pytest.raises(ValueError):
+        read_stage("raw", root=tmp_path)
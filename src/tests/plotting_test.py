@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from src.data_pipeline.parquet_storage import write_stage
+from src.plotting.plotting import (
+    TowerFigure,
+    decimate_min_max,
+    figure_title,
+    render_fleet,
+    target_bands,
+)
+
+COLUMNS = ["initial_ec", "initial_ph"]
+
+
+def make_plot_data(num_rows, start="2023-01-26", seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "initial_ec": 2000 + rng.normal(0, 50, num_rows),
+            "initial_ph": 6.2 + rng.normal(0, 0.1, num_rows),
+        }
+    )
+    df.insert(0, "date", pd.date_range(start, periods=num_rows))
+    return df
+
+
+def test_figure_title():
+    assert (
+        figure_title("subset_zip_grow_tower_side_b", "win23")
+        == "Winter 23 Subset Zip Grow Tower Side B"
+    )
+
+
+def test_target_bands():
+    bands = target_bands(["initial_ec", "sim_initial_ph", "final_volume"])
+    assert set(bands) == {"initial_ec", "sim_initial_ph"}
+
+
+def test_decimate_min_max():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 100) + np.random.default_rng(0).normal(0, 0.1, len(x))
+    xs, ys = decimate_min_max(x, y, 100)
+    assert len(xs) <= 200
+    assert np.all(np.diff(xs) >= 0)
+    assert ys.min() == y.min() and ys.max() == y.max()
+    assert np.array_equal(ys, y[xs.astype(int)])
+
+    # Short series are left unchanged
+    xs, ys = decimate_min_max(x[:150], y[:150], 100)
+    assert np.array_equal(ys, y[:150])
+
+
+def test_tower_figure_append(tmp_path):
+    df = make_plot_data(60)
+    figure = TowerFigure(COLUMNS, title="Winter 23 Side B", figsize=(6, 4))
+    figure.set_data(df.iloc[:40])
+    lines = dict(figure.lines)
+    figure.append(df.iloc[40:])
+
+    # The existing lines are updated with every day
+    assert figure.lines == lines
+    assert np.allclose(figure.lines["initial_ec"].get_ydata(), df["initial_ec"])
+    path = tmp_path / "side_b.png"
+    figure.save(path)
+    assert path.read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+
+
+def test_render_fleet(tmp_path):
+    root = tmp_path / "parquet"
+    for seed, tower in enumerate(["side_a", "side_b"]):
+        write_stage(make_plot_data(30, seed=seed), "interpolated", tower, "win23", root)
+    paths = render_fleet(
+        "interpolated", COLUMNS, "plot", output_dir=tmp_path, root=root, max_workers=1
+    )
+    assert sorted(paths) == [
+        str(tmp_path / "win23_side_a_plot.png"),
+        str(tmp_path / "win23_side_b_plot.png"),
+    ]
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from src.system_identification.recursive_identification import (
+    RecursiveSystemIdentification,
+)
+
+
+def make_model(seed=0):
+    rng = np.random.default_rng(seed)
+    A = np.array([[0.9, 0.1, 0.0], [0.0, 0.7, 0.1], [0.0, 0.0, 0.5]])
+    B = rng.standard_normal((3, 5))
+    C = np.eye(3) + 0.1 * rng.standard_normal((3, 3))
+    D = 0.1 * rng.standard_normal((3, 5))
+    return A, B, C, D
+
+
+def simulate(A, B, C, D, U, x):
+    Y = np.empty((U.shape[0], C.shape[0]))
+    for k, u in enumerate(U):
+        Y[k] = C @ x + D @ u
+        x = A @ x + B @ u
+    return Y, x
+
+
+def test_recursive_identification_converges():
+    A, B, C, D = make_model()
+    U = np.random.default_rng(1).standard_normal((200, 5))
+    Y, _ = simulate(A, B, C, D, U, np.zeros(3))
+    identification = RecursiveSystemIdentification(
+        A + 0.2, 0.5 * B, C, D, forgetting_factor=1.0
+    )
+    for u, y in zip(U, Y):
+        identification.update(u, y)
+    assert np.allclose(identification.A, A, atol=1e-6)
+    assert np.allclose(identification.B, B, atol=1e-6)
+
+
+def test_recursive_identification_tracks_drift():
+    A, B, C, D = make_model()
+    rng = np.random.default_rng(2)
+    U = rng.standard_normal((300, 5))
+    Y_first, x = simulate(A, B, C, D, U[:150], np.zeros(3))
+    drifted_A = 0.8 * A
+    Y_second, _ = simulate(drifted_A, B, C, D, U[150:], x)
+    identification = RecursiveSystemIdentification(A, B, C, D, forgetting_factor=0.9)
+    for u, y in zip(U, np.vstack((Y_first, Y_second))):
+        identification.update(u, y)
+    assert np.allclose(identification.A, drifted_A, atol=1e-3)
+
+
+def test_recursive_identification_from_npz(tmp_path):
+    A, B, C, D = make_model()
+    np.savez(tmp_path / "model.npz", A=A, B=B, C=C, D=D)
+    identification = RecursiveSystemIdentification.from_npz(tmp_path / "model.npz")
+    assert np.allclose(identification.A, A)
+    identification.update(np.ones(5), np.ones(3))
+    identification.update(np.ones(5), 2 * np.ones(3))
+    identification.save(tmp_path / "updated.npz")
+    restored = RecursiveSystemIdentification.from_npz(tmp_path / "updated.npz")
+    assert np.allclose(restored.B, identification.B)
+    assert np.allclose(restored.covariance, identification.covariance)
+
+
+def test_recursive_identification_requires_full_column_rank_C():
+    A, B, C, D = make_model()
+    with pytest.raises(ValueError):
+        RecursiveSystemIdentification(A, B, C[:2], D[:2])
+
+
+def test_recursive_identification_returns_copies():
+    A, B, C, D = make_model()
+    identification = RecursiveSystemIdentification(A + 0.2, B, C, D)
+    identification.update(np.ones(5), np.ones(3))
+    A1, B1 = identification.update(np.zeros(5), 2 * np.ones(3))
+    A1_before = A1.copy()
+    identification.update(np.ones(5), 3 * np.ones(3))
+    assert not np.shares_memory(A1, identification.theta)
+    assert np.array_equal(A1, A1_before)
+    assert not np.array_equal(A1, identification.A)
+
+
+def test_recursive_identification_skips_missing_readings():
+    A, B, C, D = make_model()
+    U = np.random.default_rng(3).standard_normal((200, 5))
+    Y, _ = simulate(A, B, C, D, U, np.zeros(3))
+    # Readings with a missing output and a missing input, as left by cleaning
+    Y[40, 1] = np.nan
+    U_measured = U.copy()
+    U_measured[70, 2] = np.nan
+    identification = RecursiveSystemIdentification(
+        A + 0.2, 0.5 * B, C, D, forgetting_factor=1.0
+    )
+    for u, y in zip(U_measured, Y):
+        identification.update(u, y)
+    assert np.isfinite(identification.theta).all()
+    assert np.allclose(identification.A, A, atol=1e-6)
+    assert np.allclose(identification.B, B, atol=1e-6)
+
+
+def test_recursive_identification_keeps_noise_covariance(tmp_path):
+    A, B, C, D = make_model()
+    covariance = np.eye(6)
+    np.savez(tmp_path / "model.npz", A=A, B=B, C=C, D=D, covariance=covariance)
+    identification = RecursiveSystemIdentification.from_npz(tmp_path / "model.npz")
+    identification.save(tmp_path / "updated.npz")
+    with np.load(tmp_path / "updated.npz") as weights:
+        assert np.array_equal(weights["covariance"], covariance)
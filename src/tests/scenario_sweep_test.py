@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from src.linear_control_system.linear_control_system import LinearControlSystem
+from src.linear_control_system.simulation import simulate_outputs
+from src.scenario_analysis.scenario_sweep import (
+    ScenarioSweep,
+    dosing_schedule,
+    policy_grid,
+)
+
+
+def make_systems(seed=0):
+    # Two towers identified with different ranks
+    rng = np.random.default_rng(seed)
+    systems = []
+    for n in (3, 2):
+        A = np.diag(np.linspace(0.9, 0.5, n))
+        B = 0.1 * rng.standard_normal((n, 5))
+        C = rng.standard_normal((3, n))
+        D = 0.01 * rng.standard_normal((3, 5))
+        systems.append(LinearControlSystem(A, B, rng.standard_normal(n), C, D))
+    return systems
+
+
+def test_policy_grid():
+    amounts, every = policy_grid({"pH_down_mL": [0, 2, 4]}, {"pH_down_mL": [1, 7]})
+    assert amounts.shape == every.shape == (6, 5)
+    assert set(amounts[:, 0]) == {0, 2, 4}
+    assert (amounts[:, 1:] == 0).all()
+    with pytest.raises(ValueError):
+        policy_grid({"pH_sideways_mL": [1]})
+
+
+def test_dosing_schedule():
+    U = dosing_schedule([[2.0, 0, 0, 0, 1.0]], [[3, 1, 1, 1, 1]], 7)
+    assert U.shape == (1, 7, 5)
+    assert U[0, :, 0].tolist() == [2, 0, 0, 2, 0, 0, 2]
+    assert (U[0, :, 4] == 1).all()
+    with pytest.raises(ValueError):
+        dosing_schedule([[1.0] * 5], [[0] * 5], 7)
+
+
+def test_simulate_matches_linear_control_system():
+    systems = make_systems()
+    sweep = ScenarioSweep.from_systems(systems)
+    amounts, every = policy_grid(
+        {"pH_up_mL": [0, 1], "water_gallons": [0.5, 1]}, {"water_gallons": [1, 3]}
+    )
+    Y = sweep.simulate(amounts, every, 30)
+    assert Y.shape == (8, 2, 30, 3)
+    for i, system in enumerate(systems):
+        x = system.x.copy()
+        for k, U in enumerate(dosing_schedule(amounts, every, 30)):
+            system.x = x
+            assert np.allclose(Y[k, i], simulate_outputs(system, U))
+
+
+def test_time_in_band_chunks():
+    sweep = ScenarioSweep.from_systems(
+        make_systems(),
+        towers=["side_a", "side_b"],
+        target_bands={
+            "initial_ec": (-1, 1),
+            "initial_ph": (-0.5, 0.5),
+            "initial_nutrient_solution_volume": (-2, 2),
+        },
+    )
+    amounts, every = policy_grid({"pH_down_mL": [0, 1, 2, 3, 4]}, {"pH_up_mL": [1, 2]})
+    per_output, all_outputs = sweep.time_in_band(amounts, every, 50)
+    Y = sweep.simulate(amounts, every, 50)
+    in_band = (Y >= sweep.band_min) & (Y <= sweep.band_max)
+    assert np.allclose(per_output, in_band.mean(axis=2))
+    assert np.allclose(all_outputs, in_band.all(axis=3).mean(axis=2))
+
+    # One policy per chunk gives the same result
+    chunked = sweep.time_in_band(amounts, every, 50, max_chunk_bytes=1)
+    assert np.array_equal(chunked[0], per_output)
+    assert np.array_equal(chunked[1], all_outputs)
+
+    df = sweep.sweep(amounts, every, 50)
+    assert len(df) == 20
+    assert df["tower"].tolist()[:2] == ["side_a", "side_b"]
+    assert np.allclose(df["time_in_band"], all_outputs.reshape(-1))
+
+
+def test_initial_outputs():
+    systems = make_systems()
+    y0 = np.array([2200, 6.2, 5.5])
+    sweep = ScenarioSweep.from_systems(systems, initial_outputs=y0)
+    # Every policy doses on day 0, so the feedthrough of its dose is taken out of the
+    # initial state
+    amounts = np.array([[0, 0, 0, 0, 0], [5, 0, 0.5, 0.2, 0], [0, 3, 0, 0, 1]])
+    every = np.ones((3, 5), int)
+    Y = sweep.simulate(amounts, every, 4)
+    assert np.allclose(Y[:, 0, 0], y0)
+
+    # The second tower has fewer states than outputs, so it starts from the least
+    # squares state
+    U = dosing_schedule(amounts, every, 4)
+    system = systems[1]
+    for i in range(len(amounts)):
+        system.x = np.linalg.pinv(system.C) @ (y0 - system.D @ U[i, 0])
+        assert np.allclose(Y[i, 1], simulate_outputs(system, U[i]))
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from nfoursid.state_space import StateSpace
+
+from src.linear_control_system.linear_control_system import LinearControlSystem
+from src.linear_control_system.simulation import (
+    estimate_initial_state,
+    simulate_dataframe,
+    simulate_outputs,
+)
+
+INPUT_COLUMNS = ["u0", "u1"]
+OUTPUT_COLUMNS = ["y0", "y1", "y2"]
+
+
+def make_model(seed=0):
+    rng = np.random.default_rng(seed)
+    A = 0.3 * rng.standard_normal((3, 3))
+    B = rng.standard_normal((3, 2))
+    C = rng.standard_normal((3, 3))
+    D = rng.standard_normal((3, 2))
+    return A, B, C, D
+
+
+def make_df(num_rows=300, seed=1):
+    rng = np.random.default_rng(seed)
+    data = rng.standard_normal((num_rows, 5))
+    return pd.DataFrame(data, columns=INPUT_COLUMNS + OUTPUT_COLUMNS)
+
+
+def step_outputs(A, B, C, D, x, U):
+    outputs = []
+    for u in U:
+        outputs.append(C @ x + D @ u)
+        x = A @ x + B @ u
+    return np.array(outputs), x
+
+
+# Test cases for simulate_outputs
+def test_simulate_outputs_matches_step_loop():
+    A, B, C, D = make_model()
+    U = np.random.default_rng(2).standard_normal((300, 2))
+    x = np.ones(3)
+    system = LinearControlSystem(A, B, x, C, D)
+    outputs = simulate_outputs(system, U)
+    expected, final_state = step_outputs(A, B, C, D, x, U)
+    assert np.allclose(outputs, expected)
+    assert np.allclose(system.x, final_state)
+
+
+def test_simulate_outputs_with_invalid_out():
+    A, B, C, D = make_model()
+    system = LinearControlSystem(A, B, np.zeros(3), C, D)
+    with pytest.raises(ValueError):
+        simulate_outputs(system, np.zeros((10, 2)), out=np.empty((10, 2)))
+
+
+# Test cases for simulate_dataframe
+def test_simulate_dataframe_matches_nfoursid_step():
+    A, B, C, D = make_model()
+    df = make_df()
+    simulated_df = simulate_dataframe(
+        StateSpace(A, B, C, D), df, INPUT_COLUMNS, OUTPUT_COLUMNS
+    )
+
+    state_space = StateSpace(A, B, C, D)
+    first = df.iloc[0]
+    state_space._set_x_init(
+        estimate_initial_state(
+            LinearControlSystem(A, B, np.zeros(3), C, D),
+            first[INPUT_COLUMNS].to_numpy(),
+            first[OUTPUT_COLUMNS].to_numpy(),
+        ).reshape(-1, 1)
+    )
+    expected = np.hstack(
+        [state_space.step(u.reshape(-1, 1)) for u in df[INPUT_COLUMNS].to_numpy()]
+    ).T
+
+    assert list(simulated_df.columns) == [
+        "sim_" + col for col in OUTPUT_COLUMNS
+    ] + list(df.columns)
+    assert np.allclose(
+        simulated_df[["sim_" + col for col in OUTPUT_COLUMNS]].to_numpy(), expected
+    )
+    pd.testing.assert_frame_equal(simulated_df[df.columns], df)
+
+
+def test_simulate_dataframe_requires_C():
+    A, B, _, _ = make_model()
+    with pytest.raises(ValueError):
+        simulate_dataframe(
+            LinearControlSystem(A, B, np.zeros(3)),
+            make_df(),
+            INPUT_COLUMNS,
+            OUTPUT_COLUMNS,
+        )
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.constants import INPUT_COLUMNS, OUTPUT_COLUMNS
+from src.data_pipeline.streaming import (
+    StreamingSimulator,
+    run_streaming_pipeline,
+    simulate_chunks,
+    write_csv_chunks,
+)
+from src.data_pipeline.synthetic_data import generate_daily_system_log
+
+
+def make_model():
+    rng = np.random.default_rng(0)
+    A = 0.5 * rng.standard_normal((3, 3))
+    B = rng.standard_normal((3, 5))
+    C = np.eye(3) + 0.1 * rng.standard_normal((3, 3))
+    D = 0.1 * rng.standard_normal((3, 5))
+    return A, B, C, D
+
+
+def make_interpolated_data(num_rows=20):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.random((num_rows, 5)), columns=INPUT_COLUMNS)
+    df[OUTPUT_COLUMNS] = rng.random((num_rows, 3))
+    return df
+
+
+def simulate_step_by_step(A, B, C, D, df):
+    inputs = df[INPUT_COLUMNS].to_numpy()
+    outputs = df[OUTPUT_COLUMNS].to_numpy()
+    x = np.linalg.inv(C) @ (outputs[0] - D @ inputs[0])
+    simulated = []
+    for u in inputs:
+        simulated.append(C @ x + D @ u)
+        x = A @ x + B @ u
+    return np.array(simulated)
+
+
+@pytest.mark.parametrize("chunksize", [1, 3, 20])
+def test_streaming_simulator_carries_state(chunksize, tmp_path):
+    A, B, C, D = make_model()
+    df = make_interpolated_data()
+    simulator = StreamingSimulator(A, B, C, D)
+    chunks = (
+        df.iloc[start : start + chunksize] for start in range(0, len(df), chunksize)
+    )
+    path = tmp_path / "simulated.csv"
+    assert write_csv_chunks(simulate_chunks(chunks, simulator), path) == len(df)
+
+    simulated_df = pd.read_csv(path)
+    sim_columns = ["sim_" + col for col in OUTPUT_COLUMNS]
+    assert list(simulated_df.columns) == sim_columns + list(df.columns)
+    assert np.allclose(simulated_df[sim_columns], simulate_step_by_step(A, B, C, D, df))
+
+
+def test_streaming_pipeline_writes_simulated_stage_columns(tmp_path):
+    raw_path = tmp_path / "raw.csv"
+    generate_daily_system_log(60, seed=0).to_csv(raw_path, index=False)
+    weights_path = tmp_path / "model.npz"
+    np.savez(weights_path, **dict(zip("ABCD", make_model())))
+    output_path = tmp_path / "simulated.csv"
+    assert run_streaming_pipeline(raw_path, output_path, weights_path, chunksize=7)
+
+    sim_columns = ["sim_" + col for col in OUTPUT_COLUMNS]
+    assert list(pd.read_csv(output_path).columns) == (
+        sim_columns + ["date"] + OUTPUT_COLUMNS + INPUT_COLUMNS
+    )
@@ -0,0 +1,42 @@
+import io
+
+import pandas as pd
+
+from src.constants import INPUT_COLUMNS
+from src.data_pipeline.cleaning import clean_daily_system_data
+from src.data_pipeline.interpolation import interpolate_daily_system_data
+from src.data_pipeline.synthetic_data import RAW_COLUMNS, generate_daily_system_log
+
+
+def read_back(df):
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+
+# Test cases for generate_daily_system_log
+def test_generated_log_matches_recorded_format():
+    recorded = pd.read_csv(
+        "data/daily_system_data/win23_subset_zip_grow_tower_side_b_manual_mod.csv"
+    )
+    generated = read_back(generate_daily_system_log(400, seed=0))
+    assert list(recorded.columns) == RAW_COLUMNS
+    assert list(generated.columns) == RAW_COLUMNS
+    assert generated["Date"].iloc[0] == "1/26"
+    assert not generated["Date"].eq("2/29").any()
+
+
+def test_generated_log_is_reproducible():
+    pd.testing.assert_frame_equal(
+        generate_daily_system_log(100, seed=3), generate_daily_system_log(100, seed=3)
+    )
+
+
+def test_generated_log_cleans_and_interpolates():
+    generated = read_back(generate_daily_system_log(3 * 365, seed=1))
+    cleaned = clean_daily_system_data(generated)
+    interpolated = interpolate_daily_system_data(cleaned)
+    assert len(interpolated) == len(generated)
+    assert not interpolated[["initial_ec", "initial_ph"]].isna().any().any()
+    assert (cleaned[INPUT_COLUMNS] > 0).any().all()
@@ -0,0 +1,109 @@
+import numpy as np
+
+from src.constants import OUTPUT_COLUMNS, TARGET_BANDS
+
+
+def _covariance_factor(covariance):
+    # Symmetric square root that also accepts singular covariance estimates
+    eigenvalues, eigenvectors = np.linalg.eigh(0.5 * (covariance + covariance.T))
+    return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+class MonteCarloSimulation:
+    def __init__(
+        self,
+        A,
+        B,
+        C,
+        D,
+        noise_covariance,
+        initial_state_covariance=None,
+        parameter_covariance=None,
+        output_columns=OUTPUT_COLUMNS,
+        target_bands=TARGET_BANDS,
+    ):
+        n, m = B.shape
+        p = C.shape[0]
+        # Covariance of [v; w] as returned by nfoursid, with measurement noise v
+        # on y_k = C x_k + D u_k + v_k and process noise w on x_(k+1) = A x_k + B u_k + w_k
+        if noise_covariance.shape != (p + n, p + n):
+            raise ValueError(
+                "Noise covariance must be square with rows of C plus rows of A"
+            )
+        if parameter_covariance is not None and parameter_covariance.shape != (
+            n * (n + m),
+            n * (n + m),
+        ):
+            raise ValueError("Parameter covariance must match the entries of [A B]")
+        self.A = A
+        self.B = B
+        self.C = C
+        self.D = D
+        self.noise_factor = _covariance_factor(noise_covariance)
+        self.initial_state_factor = (
+            None
+            if initial_state_covariance is None
+            else _covariance_factor(initial_state_covariance)
+        )
+        # Covariance of the row-major entries of [A B], e.g. from a recursive fit
+        self.parameter_factor = (
+            None
+            if parameter_covariance is None
+            else _covariance_factor(parameter_covariance)
+        )
+        self.band_min, self.band_max = np.array(
+            [target_bands[col] for col in output_columns], float
+        ).T
+
+    @classmethod
+    def from_npz(cls, path, **kwargs):
+        with np.load(path) as weights:
+            if "covariance" not in weights:
+                raise ValueError(
+                    f"{path} has no noise covariance, re-run the realization"
+                )
+            return cls(
+                weights["A"],
+                weights["B"],
+                weights["C"],
+                weights["D"],
+                weights["covariance"],
+                **kwargs,
+            )
+
+    def propagate(self, x, U, num_samples=10_000, percentiles=(5, 50, 95), seed=None):
+        rng = np.random.default_rng(seed)
+        U = np.asarray(U, dtype=float)
+        num_steps = U.shape[0]
+        n, m = self.B.shape
+        p = self.C.shape[0]
+
+        # All realizations advance together as one (samples x state) array per step
+        X = np.tile(np.asarray(x, dtype=float).reshape(-1), (num_samples, 1))
+        if self.initial_state_factor is not None:
+            X += rng.standard_normal((num_samples, n)) @ self.initial_state_factor.T
+        if self.parameter_factor is not None:
+            parameters = np.hstack((self.A, self.B)).reshape(-1) + (
+                rng.standard_normal((num_samples, n * (n + m)))
+                @ self.parameter_factor.T
+            )
+            parameters = parameters.reshape(num_samples, n, n + m)
+            A_samples, B_samples = parameters[:, :, :n], parameters[:, :, n:]
+
+        output_percentiles = np.empty((len(percentiles), num_steps, p))
+        out_of_band = np.empty((num_steps, p))
+        ever_out_of_band = np.zeros((num_samples, p), dtype=bool)
+        for k, u in enumerate(U):
+            noise = rng.standard_normal((num_samples, p + n)) @ self.noise_factor.T
+            Y = X @ self.C.T + self.D @ u + noise[:, :p]
+
+            output_percentiles[:, k] = np.percentile(Y, percentiles, axis=0)
+            outside = (Y < self.band_min) | (Y > self.band_max)
+            out_of_band[k] = outside.mean(axis=0)
+            ever_out_of_band |= outside
+
+            if self.parameter_factor is None:
+                X = X @ self.A.T + self.B @ u + noise[:, p:]
+            else:
+                X = np.einsum("sij,sj->si", A_samples, X) + B_samples @ u + noise[:, p:]
+        return output_percentiles, out_of_band, ever_out_of_band.mean(axis=0)